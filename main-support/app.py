@@ -1,12 +1,36 @@
 from math import isnan, isfinite
+import bisect
+import contextlib
+import functools
+import gzip
+import hashlib
+import io
 import logging
+import mimetypes
+import operator
 import re
 import shutil
 import struct
 import sys
-from flask import Flask, send_from_directory, jsonify, request
+import threading
+import time
+import uuid
+from flask import Flask, send_from_directory, jsonify, request, g, has_request_context
+from werkzeug.http import http_date, parse_date
 import os
 import json
+import zlib
+
+# 起動時間の計測起点（import完了・初期化完了までの時間をログに出す）
+STARTUP_STARTED = time.perf_counter()
+
+# 使う場面が限られるモジュールは初回使用時にimportする（起動時間短縮）
+@functools.lru_cache(maxsize=None)
+def get_optional_module(name):
+    try:
+        return __import__(name)
+    except ImportError:  # numpy/brotli が無い環境ではスカラー経路・gzipのみ
+        return None
 
 # 実行可能ファイルのディレクトリを取得（PyInstaller対応）
 if getattr(sys, 'frozen', False):
@@ -19,14 +43,354 @@ else:
 
 # ディレクトリパスをプロジェクトルート基準に設定
 STATIC_FOLDER = os.path.join(BASE_DIR, 'build')
-DATA_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "data"))
+# CHIGADIO_DATA_DIR で別のデータディレクトリを使える（ベンチマーク・複数プロジェクトの切り替え用）
+DATA_DIR = os.path.abspath(os.environ.get('CHIGADIO_DATA_DIR') or os.path.join(BASE_DIR, "..", "data"))
 
 CLASS_DATA_ID = 'class-data-id'
 CLASS_DATA_MATRIX_ID = 'class-data-matrix-id'
-logging.basicConfig(level=logging.DEBUG)
+# ログ設定: CHIGADIO_LOG_LEVEL（既定 INFO）、CHIGADIO_LOG_FORMAT=json で1行1JSONのログ
+LOG_LEVEL_ENV = 'CHIGADIO_LOG_LEVEL'
+LOG_FORMAT_ENV = 'CHIGADIO_LOG_FORMAT'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# ログレコードにリクエストIDを付与する（リクエスト外は '-'）
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def configure_logging():
+    level = os.environ.get(LOG_LEVEL_ENV, 'INFO').upper()
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestIdFilter())
+    if os.environ.get(LOG_FORMAT_ENV, 'text').lower() == 'json':
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'))
+    logging.basicConfig(level=getattr(logging, level, logging.INFO), handlers=[handler], force=True)
+
+# デバッグログ用のペイロード要約。%s で整形されるまで（＝ログが出力されるまで）何も計算しない
+class PayloadSummary:
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        data = self.data
+        if isinstance(data, dict):
+            return f"dict({len(data)} keys)"
+        if isinstance(data, (list, tuple)):
+            return f"{type(data).__name__}({len(data)} items)"
+        if isinstance(data, (bytes, bytearray)):
+            return f"{type(data).__name__}({len(data)} bytes)"
+        if isinstance(data, str):
+            return f"str({len(data)} chars)"
+        return type(data).__name__
+
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder=STATIC_FOLDER)
+
+# リクエストID: クライアントが X-Request-ID を送ればそれを使い、無ければ採番してレスポンスにも返す
+@app.before_request
+def assign_request_id():
+    g.request_id = (request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:16])[:64]
+
+@app.after_request
+def attach_request_id(response):
+    response.headers[REQUEST_ID_HEADER] = g.get('request_id', '-')
+    return response
+
+# メトリクス: エンドポイントごとのリクエスト数・レイテンシ・送受信バイト数、キャッシュのヒット率、生成処理のフェーズ別時間
+# /metrics でPrometheusテキスト形式、/metrics?format=json でJSONを返す
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最後は +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # (上限, 累積件数) の列。上限 None は +Inf
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (None,), self.counts):
+            total += count
+            yield bound, total
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}       # (endpoint, method, status) -> 件数
+            self.latency = {}        # endpoint -> Histogram
+            self.bytes_in = {}       # endpoint -> バイト数
+            self.bytes_out = {}      # endpoint -> バイト数
+            self.cache = {}          # (cache, 'hit' | 'miss') -> 件数
+            self.phases = {}         # (generator, phase) -> Histogram
+
+    def observe_request(self, endpoint, method, status, seconds, bytes_in):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(endpoint, Histogram()).observe(seconds)
+            self.bytes_in[endpoint] = self.bytes_in.get(endpoint, 0) + bytes_in
+
+    def add_bytes_out(self, endpoint, size):
+        with self._lock:
+            self.bytes_out[endpoint] = self.bytes_out.get(endpoint, 0) + size
+
+    def cache_result(self, cache, hit):
+        with self._lock:
+            key = (cache, 'hit' if hit else 'miss')
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    def observe_phase(self, generator, phase, seconds):
+        with self._lock:
+            self.phases.setdefault((generator, phase), Histogram()).observe(seconds)
+
+    # 生成処理のフェーズ計測。同じフェーズを複数回通れば（テーブルごとの読み込み等）それぞれ記録する
+    @contextlib.contextmanager
+    def phase(self, name):
+        generator = (request.endpoint or '-') if has_request_context() else '-'
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(generator, name, time.perf_counter() - started)
+
+    # 処理の区切りごとに lap(フェーズ名) を呼ぶと、前回の区切りからの時間をそのフェーズとして記録する
+    def phase_laps(self):
+        generator = (request.endpoint or '-') if has_request_context() else '-'
+        last = [time.perf_counter()]
+        def lap(name):
+            now = time.perf_counter()
+            self.observe_phase(generator, name, now - last[0])
+            last[0] = now
+        return lap
+
+    def to_json(self):
+        with self._lock:
+            caches = {}
+            for (cache, result), count in self.cache.items():
+                caches.setdefault(cache, {'hit': 0, 'miss': 0})[result] = count
+            for stats in caches.values():
+                total = stats['hit'] + stats['miss']
+                stats['hit_rate'] = stats['hit'] / total if total else None
+            return {
+                'requests': [{'endpoint': e, 'method': m, 'status': int(s), 'count': c} for (e, m, s), c in sorted(self.requests.items())],
+                'endpoints': {
+                    endpoint: {
+                        'count': hist.count,
+                        'seconds_sum': hist.sum,
+                        'seconds_avg': hist.sum / hist.count if hist.count else None,
+                        'buckets': {('+Inf' if bound is None else str(bound)): total for bound, total in hist.cumulative()},
+                        'bytes_in': self.bytes_in.get(endpoint, 0),
+                        'bytes_out': self.bytes_out.get(endpoint, 0),
+                    }
+                    for endpoint, hist in sorted(self.latency.items())
+                },
+                'caches': caches,
+                'phases': [
+                    {'generator': generator, 'phase': phase, 'count': hist.count, 'seconds_sum': hist.sum}
+                    for (generator, phase), hist in sorted(self.phases.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        lines = []
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        def histogram(name, labels, hist):
+            for bound, total in hist.cumulative():
+                le = '+Inf' if bound is None else repr(float(bound))
+                lines.append(f"{name}_bucket{format_labels(**labels, le=le)} {total}")
+            lines.append(f"{name}_sum{format_labels(**labels)} {hist.sum!r}")
+            lines.append(f"{name}_count{format_labels(**labels)} {hist.count}")
+        with self._lock:
+            metric('chigadio_requests_total', 'counter', 'HTTP requests by endpoint, method and status.')
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f"chigadio_requests_total{format_labels(endpoint=endpoint, method=method, status=status)} {count}")
+            metric('chigadio_request_duration_seconds', 'histogram', 'Request handling time by endpoint.')
+            for endpoint, hist in sorted(self.latency.items()):
+                histogram('chigadio_request_duration_seconds', {'endpoint': endpoint}, hist)
+            metric('chigadio_request_bytes_total', 'counter', 'Request body bytes by endpoint.')
+            for endpoint, size in sorted(self.bytes_in.items()):
+                lines.append(f"chigadio_request_bytes_total{format_labels(endpoint=endpoint)} {size}")
+            metric('chigadio_response_bytes_total', 'counter', 'Response body bytes (after compression) by endpoint.')
+            for endpoint, size in sorted(self.bytes_out.items()):
+                lines.append(f"chigadio_response_bytes_total{format_labels(endpoint=endpoint)} {size}")
+            metric('chigadio_cache_requests_total', 'counter', 'Cache lookups by cache and result.')
+            for (cache, result), count in sorted(self.cache.items()):
+                lines.append(f"chigadio_cache_requests_total{format_labels(cache=cache, result=result)} {count}")
+            metric('chigadio_generator_phase_seconds', 'histogram', 'Time spent in each generator phase.')
+            for (generator, phase), hist in sorted(self.phases.items()):
+                histogram('chigadio_generator_phase_seconds', {'generator': generator, 'phase': phase}, hist)
+        return '\n'.join(lines) + '\n'
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + '}'
+
+metrics = MetricsRegistry()
+
+def get_metrics_endpoint():
+    return request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+# 圧縮などでサイズが事前に分からないレスポンスは送信し終えた時点のバイト数を記録する
+def iter_counted(chunks, endpoint):
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        metrics.add_bytes_out(endpoint, size)
+
+@app.before_request
+def start_request_timer():
+    g.metrics_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is None:
+        return response
+    endpoint = get_metrics_endpoint()
+    metrics.observe_request(endpoint, request.method, response.status_code, time.perf_counter() - started, request.content_length or 0)
+    length = response.calculate_content_length()
+    if length is not None:
+        metrics.add_bytes_out(endpoint, length)
+    elif response.is_streamed:
+        response.response = iter_counted(response.response, endpoint)
+    return response
+
+# リクエスト単位のプロファイル: CHIGADIO_PROFILING=1 のときだけ、X-Profile: 1 ヘッダーか ?profile=1 のリクエストを計測する
+# cProfileの結果(.pstats)と、スタックのサンプリング結果(.collapsed、flamegraph.pl / speedscope で表示可)を profiles/ に保存
+PROFILING_ENV = 'CHIGADIO_PROFILING'
+PROFILE_DIR_ENV = 'CHIGADIO_PROFILE_DIR'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_EXTENSIONS = ('.pstats', '.collapsed')
+# cProfileは同時に1つしか有効にできないため、計測中の別リクエストは計測しない
+_profile_lock = threading.Lock()
+
+def get_profile_dir():
+    return os.environ.get(PROFILE_DIR_ENV) or os.path.join(BASE_DIR, 'profiles')
+
+def profiling_requested():
+    if os.environ.get(PROFILING_ENV) != '1':
+        return False
+    return request.headers.get(PROFILE_HEADER) == '1' or request.args.get('profile') == '1'
+
+# 対象スレッドのスタックを一定間隔で記録する（collapsed形式: "外側;...;内側 件数"）
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+@app.before_request
+def start_profiler():
+    if not profiling_requested() or not _profile_lock.acquire(blocking=False):
+        return
+    import cProfile
+    sampler = StackSampler(threading.get_ident())
+    profiler = cProfile.Profile()
+    sampler.start()
+    profiler.enable()
+    g.profile = (profiler, sampler)
+
+# 計測を止めて結果を保存し、ファイル名（拡張子なし）を返す。ロックは保存に失敗しても必ず解放する
+def finish_profile(profile):
+    profiler, sampler = profile
+    try:
+        profiler.disable()
+        sampler.stop()
+        profile_dir = get_profile_dir()
+        os.makedirs(profile_dir, exist_ok=True)
+        endpoint = re.sub(r'[^A-Za-z0-9_-]+', '_', request.endpoint or 'unmatched')
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{g.get('request_id', '-')}"
+        profiler.dump_stats(os.path.join(profile_dir, name + '.pstats'))
+        with open(os.path.join(profile_dir, name + '.collapsed'), 'w', encoding='utf-8') as f:
+            f.write(sampler.collapsed())
+        logger.info(f"Saved profile {name}")
+        return name
+    except OSError as e:
+        logger.error(f"Error saving profile: {str(e)}")
+        return None
+    finally:
+        _profile_lock.release()
+
+# 正常なレスポンスにはファイル名をヘッダーで返す
+@app.after_request
+def stop_profiler(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        name = finish_profile(profile)
+        if name is not None:
+            response.headers[PROFILE_HEADER] = name
+    elif profiling_requested():
+        response.headers[PROFILE_HEADER] = 'busy'
+    return response
+
+# 例外で after_request が呼ばれなかった場合もここで計測を終了する
+@app.teardown_request
+def teardown_profiler(exc=None):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        finish_profile(profile)
+
 ENUM = 'enum'
 CLASS_DATA = 'class-data'
 STATE_DATA = 'state-data'
@@ -42,6 +406,61 @@ TYPE_MAP = {
     'vector3': {'pack': None, 'cs_read': None}  # 特殊処理
 }
 
+# Matrixの固定長フィールド型 -> NumPyのdtype（構造化配列で一括パックする）
+NUMPY_MATRIX_DTYPES = {
+    'int': ('<i4', ()),
+    'float': ('<f4', ()),
+    'double': ('<f8', ()),
+    'bool': ('?', ()),
+    'vector2': ('<f4', (2,)),
+    'vector3': ('<f4', (3,)),
+}
+
+# ビルド設定（DATA_DIR/build_settings.json で上書き可能）
+BUILD_SETTINGS_FILE = 'build_settings.json'
+DEFAULT_BUILD_SETTINGS = {
+    # カラム名・型名の代わりにスキーマの64bitハッシュをセクションに書き込む
+    'schema_fingerprint': False,
+    # 文字列をコンテナ共通の文字列プールにまとめ、セル側はint32のインデックスのみ持つ
+    'string_pool': False,
+    # コンテナのセクション圧縮（COMPRESSION_CODECS のキー）
+    'compression': 'none',
+    # boolカラムを行ごとにビットパックし、enum/ClassDataID参照を値域に応じて uint8/uint16 で格納
+    'narrow_columns': False,
+    # Matrixの格納方式の既定値（Matrix側のJSONの "storage" で個別に上書き可能）
+    'matrix_storage': 'dense',
+    # コンテナ末尾にビルドハッシュのセクションを書き込み、テーブル単位のパッチ（generate-patch）を使えるようにする
+    'patches': False,
+}
+
+# Matrixの格納方式
+# dense: 全セルを行優先で格納 / sparse: 既定セル + 既定値以外のセルのみCSR形式で格納
+# flat: バイナリはdenseと同じで、C#側を辞書ではなく1次元配列 E[rowCount * colCount] で保持
+MATRIX_STORAGE_MODES = ('dense', 'sparse', 'flat')
+
+# 値域ごとの格納幅（struct書式, 最大値）とC#の読み込みメソッド
+NARROW_WIDTHS = [('B', 0xFF), ('H', 0xFFFF)]
+CS_READ_BY_PACK = {'B': 'ReadByte', 'H': 'ReadUInt16', 'i': 'ReadInt32'}
+
+# 文字列プールセクション（コンテナ内では TableID.None = 0 のエントリとして格納）
+STRING_POOL_SECTION_ID = 0
+STRING_POOL_SECTION = '__string_pool__'
+
+# ビルドハッシュセクション（patches 設定時のみコンテナ末尾に書く id -1 のエントリ。パッチの適用先の照合に使う）
+BUILD_HASH_SECTION_ID = -1
+BUILD_HASH_SECTION = '__build__'
+
+# ビルドキャッシュ: 環境変数で指定したディレクトリ（共有ボリューム可）に生成物を入力ハッシュで保存
+# 生成処理の出力が変わる変更を入れたら GENERATOR_VERSION を上げる
+BUILD_CACHE_DIR_ENV = 'CHIGADIO_BUILD_CACHE_DIR'
+GENERATOR_VERSION = '1'
+BUILD_CACHE_OUTPUT_EXTENSIONS = ('.cs', '.bin')
+
+# テーブル単位のパッチファイル（"CDP1"）と出力先（各データディレクトリ配下）
+PATCH_MAGIC = b'CDP1'
+PATCH_DIR = 'patches'
+PATCH_VERSIONS_FILE = 'patch_versions.json'
+
 def get_enum_values():
     enum_list = json.load(open(os.path.join(DATA_DIR, ENUM, 'enum_list.json'))) if os.path.exists(os.path.join(DATA_DIR, ENUM, 'enum_list.json')) else []
     class_id_list = json.load(open(os.path.join(DATA_DIR, CLASS_DATA_ID, 'class_data_id_list.json'))) if os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, 'class_data_id_list.json')) else []
@@ -54,6 +473,342 @@ def get_enum_values():
         enum_values[c['name']] = [r['enum_property'] for r in class_id_data['rows']]
     return enum_values
 
+def get_build_settings():
+    settings = dict(DEFAULT_BUILD_SETTINGS)
+    settings_path = os.path.join(DATA_DIR, BUILD_SETTINGS_FILE)
+    if os.path.exists(settings_path):
+        with open(settings_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+    return settings
+
+# Matrixの格納方式（Matrix側の指定 > ビルド設定）
+def get_matrix_storage(json_data, settings=None):
+    storage = json_data.get('storage') or (settings or get_build_settings())['matrix_storage']
+    if storage not in MATRIX_STORAGE_MODES:
+        raise ValueError(f"Unknown matrix storage: {storage}")
+    return storage
+
+# カラム構成（名前と型）から64bitのスキーマハッシュを計算
+# widths指定時（narrow_columns）は格納幅も含める
+def get_schema_hash(columns, widths=None):
+    schema = "\n".join(f"{col['name']}:{col['type']}" + (f":{widths[col['name']]}" if widths and col['name'] in widths else '') for col in columns)
+    if widths is not None:
+        schema += "\nnarrow"
+    return int.from_bytes(hashlib.blake2b(schema.encode('utf-8'), digest_size=8).digest(), 'little')
+
+# 値の最大値が収まる最小の格納幅（struct書式）
+def get_narrow_pack(values):
+    values = list(values)
+    if values and min(values) < 0:
+        return 'i'
+    max_value = max(values, default=0)
+    return next((pack for pack, limit in NARROW_WIDTHS if max_value <= limit), 'i')
+
+# enum/ClassDataID参照カラムの格納幅 {カラム名: struct書式}
+def get_column_widths(columns, enum_list, class_data_id_list):
+    widths = {}
+    for col in columns:
+        if col['type'] in enum_list:
+            widths[col['name']] = get_narrow_pack(int(entry['value']) for entry in get_json_enum(col['type']))
+        elif col['type'] in class_data_id_list:
+            data_id = get_json_data_id(col['type'])
+            widths[col['name']] = get_narrow_pack(int(entry['id']) for entry in (data_id.get('rows', []) if data_id else []))
+    return widths
+
+# boolの並びを1bitずつ詰める（先頭カラムが最下位ビット）
+def pack_bool_flags(values):
+    flags = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value:
+            flags[i >> 3] |= 1 << (i & 7)
+    return flags
+
+# 圧縮コンテナの識別子（先頭4バイト "CDZ1"）
+COMPRESSED_CONTAINER_MAGIC = b'CDZ1'
+
+# raw deflate（C#標準の DeflateStream で展開できる形式）
+def deflate_raw(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return compressor.compress(bytes(data)) + compressor.flush()
+
+def inflate_raw(data):
+    return zlib.decompress(bytes(data), -15)
+
+# セクション圧縮コーデック: 名前 -> (コーデックID, 圧縮関数, 展開関数)
+# ID 0 は非圧縮。生成するC#が展開できるのは deflate（DeflateStream）のみ
+# register_compression_codec で追加したコーデックは、ゲーム側で ClassDataHeader.Codecs に同じIDで展開処理を登録する
+COMPRESSION_CODECS = {
+    'none': (0, None, None),
+    'deflate': (1, deflate_raw, inflate_raw),
+}
+
+def register_compression_codec(name, codec_id, compress, decompress):
+    if any(codec[0] == codec_id for key, codec in COMPRESSION_CODECS.items() if key != name):
+        raise ValueError(f"Codec id {codec_id} is already registered")
+    COMPRESSION_CODECS[name] = (codec_id, compress, decompress)
+
+# 文字列をバイト列化（プール指定時はプールのインデックス）
+def pack_string(value, string_pool=None):
+    value = value if isinstance(value, str) else ''
+    if string_pool is not None:
+        return struct.pack('i', string_pool.setdefault(value, len(string_pool)))
+    encoded = value.encode('utf-8')
+    return struct.pack('i', len(encoded)) + encoded
+
+# 文字列プールセクション: 件数, (長さ, UTF-8)...
+def encode_string_pool(string_pool):
+    pool_data = bytearray(struct.pack('i', len(string_pool)))
+    for value in string_pool:
+        encoded = value.encode('utf-8')
+        pool_data.extend(struct.pack('i', len(encoded)))
+        pool_data.extend(encoded)
+    return pool_data
+
+# 全セクション（id, 名前, 展開後の内容）から64bitのビルドハッシュを計算
+def get_build_hash(entries):
+    digest = hashlib.blake2b(digest_size=8)
+    for id_, name, section in entries:
+        name_encoded = name.encode('utf-8')
+        digest.update(struct.pack('ii', id_, len(name_encoded)))
+        digest.update(name_encoded)
+        digest.update(struct.pack('i', len(section)))
+        digest.update(section)
+    return int.from_bytes(digest.digest(), 'little')
+
+# コンテナ（ヘッダ + セクション）を組み立てる
+# entries: [(id, name, section), ...] ヘッダ: 件数, (id, 名前長, 名前, オフセット, サイズ)...
+# 圧縮時: "CDZ1", 件数, (id, 名前長, 名前, オフセット, 格納サイズ, 展開後サイズ, コーデックID)...
+# build_hash 指定時（パッチを使う場合）は末尾にビルドハッシュのセクション（BUILD_HASH_SECTION_ID）を追加する
+def build_container(entries, compression='none', build_hash=False):
+    if compression not in COMPRESSION_CODECS:
+        raise ValueError(f"Unknown compression codec: {compression}")
+    codec_id, compress, _ = COMPRESSION_CODECS[compression]
+    if build_hash:
+        entries = list(entries) + [(BUILD_HASH_SECTION_ID, BUILD_HASH_SECTION, struct.pack('Q', get_build_hash(entries)))]
+    header = bytearray()
+    data_sections = bytearray()
+    if compress is not None:
+        header.extend(COMPRESSED_CONTAINER_MAGIC)
+    header.extend(struct.pack('i', len(entries)))
+    entry_size = 4 + 4 + 8 + 4 + (4 + 1 if compress is not None else 0)
+    current_offset = len(header) + sum(entry_size + len(name.encode('utf-8')) for _, name, _ in entries)
+    for id_, name, section in entries:
+        name_encoded = name.encode('utf-8')
+        stored, stored_codec = section, 0
+        if compress is not None:
+            compressed = compress(section)
+            # 縮まないセクションは非圧縮のまま格納
+            if len(compressed) < len(section):
+                stored, stored_codec = compressed, codec_id
+        header.extend(struct.pack('i', id_))
+        header.extend(struct.pack('i', len(name_encoded)))
+        header.extend(name_encoded)
+        header.extend(struct.pack('q', current_offset))
+        header.extend(struct.pack('i', len(stored)))
+        if compress is not None:
+            header.extend(struct.pack('iB', len(section), stored_codec))
+        current_offset += len(stored)
+        data_sections.extend(stored)
+    return header + data_sections
+
+# コンテナのヘッダを読む: [{'id', 'name', 'offset', 'size', 'raw_size', 'codec'}, ...]
+def parse_container(data):
+    compressed = data[:len(COMPRESSED_CONTAINER_MAGIC)] == COMPRESSED_CONTAINER_MAGIC
+    pos = len(COMPRESSED_CONTAINER_MAGIC) if compressed else 0
+    count, = struct.unpack_from('i', data, pos)
+    pos += 4
+    entries = []
+    for _ in range(count):
+        id_, name_len = struct.unpack_from('ii', data, pos)
+        pos += 8
+        name = bytes(data[pos:pos + name_len]).decode('utf-8')
+        pos += name_len
+        offset, size = struct.unpack_from('qi', data, pos)
+        pos += 12
+        raw_size, codec = size, 0
+        if compressed:
+            raw_size, codec = struct.unpack_from('iB', data, pos)
+            pos += 5
+        entries.append({'id': id_, 'name': name, 'offset': offset, 'size': size, 'raw_size': raw_size, 'codec': codec})
+    return entries
+
+# セクションの内容（圧縮されていれば展開）
+def read_container_section(data, entry):
+    stored = bytes(data[entry['offset']:entry['offset'] + entry['size']])
+    if entry['codec'] == 0:
+        return stored
+    decompress = next((codec[2] for codec in COMPRESSION_CODECS.values() if codec[0] == entry['codec']), None)
+    if decompress is None:
+        raise ValueError(f"Unknown section codec: {entry['codec']}")
+    return decompress(stored)
+
+# コンテナのビルドハッシュ（ビルドハッシュセクションが無ければNone）
+def get_container_build_hash(data):
+    entry = next((e for e in parse_container(data) if e['id'] == BUILD_HASH_SECTION_ID), None)
+    return struct.unpack('Q', read_container_section(data, entry))[0] if entry else None
+
+# パッチファイル: "CDP1", 版, 適用先ビルドハッシュ, テーブルID, 名前長, 名前, コーデックID, 格納サイズ, 展開後サイズ,
+# 文字列プールのサイズ（0なら無し）, 文字列プール, セクション
+def build_patch(version, base_hash, table_id, name, section, string_pool=None, compression='none'):
+    if compression not in COMPRESSION_CODECS:
+        raise ValueError(f"Unknown compression codec: {compression}")
+    codec_id, compress, _ = COMPRESSION_CODECS[compression]
+    stored, stored_codec = bytes(section), 0
+    if compress is not None:
+        compressed = compress(section)
+        if len(compressed) < len(section):
+            stored, stored_codec = compressed, codec_id
+    pool = bytes(encode_string_pool(string_pool)) if string_pool is not None else b''
+    name_encoded = name.encode('utf-8')
+    patch = bytearray(PATCH_MAGIC)
+    patch.extend(struct.pack('<iQii', version, base_hash, table_id, len(name_encoded)))
+    patch.extend(name_encoded)
+    patch.extend(struct.pack('<Biii', stored_codec, len(stored), len(section), len(pool)))
+    patch.extend(pool)
+    patch.extend(stored)
+    return patch
+
+# テーブル1つ分のパッチを書き出す（版はテーブルごとに連番）
+def write_table_patch(data_kind, container_file, table_list_file, name, encode_section):
+    kind_dir = os.path.join(DATA_DIR, data_kind)
+    container_path = os.path.join(kind_dir, container_file)
+    if not os.path.exists(container_path):
+        raise FileNotFoundError(f"{container_file} has not been generated")
+    with open(container_path, 'rb') as f:
+        base_hash = get_container_build_hash(f.read())
+    if base_hash is None:
+        raise ValueError(f"{container_file} has no build hash (enable the 'patches' build setting and regenerate it)")
+    with open(os.path.join(kind_dir, table_list_file), 'r', encoding='utf-8') as f:
+        table_id = next((item['id'] for item in json.load(f) if item['name'] == name), None)
+    if table_id is None:
+        raise ValueError(f"{name} is not in {table_list_file}")
+    settings = get_build_settings()
+    string_pool = {} if settings['string_pool'] else None
+    section = encode_section(string_pool)
+
+    patch_dir = os.path.join(kind_dir, PATCH_DIR)
+    os.makedirs(patch_dir, exist_ok=True)
+    versions_path = os.path.join(patch_dir, PATCH_VERSIONS_FILE)
+    versions = {}
+    if os.path.exists(versions_path):
+        with open(versions_path, 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+    version = versions.get(name, 0) + 1
+    patch_path = os.path.join(patch_dir, f"{name}.{version}.patch")
+    with open(patch_path, 'wb') as f:
+        f.write(build_patch(version, base_hash, table_id, name, section, string_pool, settings['compression']))
+    versions[name] = version
+    with open(versions_path, 'w', encoding='utf-8') as f:
+        json.dump(versions, f, ensure_ascii=False, indent=2)
+    return version, patch_path
+
+# ビルドキャッシュ
+# 入力JSONごとのダイジェスト {パス: ((mtime, サイズ), ダイジェスト)}（変更の無いファイルは再ハッシュしない）
+_input_digest_cache = {}
+
+def get_build_cache_dir():
+    return os.environ.get(BUILD_CACHE_DIR_ENV) or None
+
+# 生成処理自体のバージョン（GENERATOR_VERSION + このファイルの内容）
+@functools.lru_cache(maxsize=1)
+def get_generator_fingerprint():
+    digest = hashlib.blake2b(GENERATOR_VERSION.encode('utf-8'), digest_size=16)
+    try:
+        with open(os.path.abspath(__file__), 'rb') as f:
+            digest.update(f.read())
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+# DATA_DIR配下の全入力JSON（パッチ出力は除く）のダイジェスト
+def get_input_digest():
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in os.walk(DATA_DIR):
+        dirs[:] = sorted(d for d in dirs if d != PATCH_DIR)
+        for file in sorted(files):
+            if not file.endswith('.json'):
+                continue
+            path = os.path.join(root, file)
+            stat = os.stat(path)
+            cached = _input_digest_cache.get(path)
+            if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+                with open(path, 'rb') as f:
+                    cached = ((stat.st_mtime_ns, stat.st_size), hashlib.blake2b(f.read(), digest_size=16).digest())
+                _input_digest_cache[path] = cached
+            digest.update(os.path.relpath(path, DATA_DIR).replace(os.sep, '/').encode('utf-8') + b'\0')
+            digest.update(cached[1])
+    return digest.hexdigest()
+
+# 生成物の (mtime, サイズ)（生成前後で比較して出力されたファイルを特定する）
+def snapshot_outputs():
+    outputs = {}
+    for root, dirs, files in os.walk(DATA_DIR):
+        for file in files:
+            if file.endswith(BUILD_CACHE_OUTPUT_EXTENSIONS):
+                path = os.path.join(root, file)
+                stat = os.stat(path)
+                outputs[os.path.relpath(path, DATA_DIR)] = (stat.st_mtime_ns, stat.st_size)
+    return outputs
+
+def store_build_cache(entry_dir, files, response, status):
+    tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        for rel in files:
+            dest = os.path.join(tmp_dir, 'files', rel)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copyfile(os.path.join(DATA_DIR, rel), dest)
+        os.makedirs(tmp_dir, exist_ok=True)
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'files': [rel.replace(os.sep, '/') for rel in files], 'response': response, 'status': status}, f, ensure_ascii=False, indent=2)
+        # 他のマシン・プロセスが同じキーを書いていた場合はそちらを優先
+        os.rename(tmp_dir, entry_dir)
+    except OSError as e:
+        logger.debug("Build cache store skipped for %s: %s", entry_dir, e)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def restore_build_cache(entry_dir):
+    with open(os.path.join(entry_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for rel in manifest['files']:
+        dest = os.path.join(DATA_DIR, *rel.split('/'))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(os.path.join(entry_dir, 'files', *rel.split('/')), dest)
+    return manifest
+
+# 生成エンドポイント用: 入力ハッシュ + 生成処理のバージョン + リクエストをキーに、出力(.cs/.bin)をキャッシュからコピーする
+def build_cached(handler):
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        cache_dir = get_build_cache_dir()
+        if not cache_dir:
+            return handler(*args, **kwargs)
+        key_digest = hashlib.blake2b(digest_size=20)
+        for part in (get_generator_fingerprint(), request.path, get_input_digest()):
+            key_digest.update(part.encode('utf-8') + b'\0')
+        key_digest.update(request.get_data())
+        key = key_digest.hexdigest()
+        entry_dir = os.path.join(cache_dir, key[:2], key)
+        if os.path.exists(os.path.join(entry_dir, 'manifest.json')):
+            try:
+                manifest = restore_build_cache(entry_dir)
+                metrics.cache_result('build', True)
+                logger.info(f"Build cache hit for {request.path} ({len(manifest['files'])} files)")
+                return jsonify(manifest['response']), manifest['status']
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Build cache entry {key} is unreadable, regenerating: {str(e)}")
+        metrics.cache_result('build', False)
+        before = snapshot_outputs()
+        result = handler(*args, **kwargs)
+        response = app.make_response(result)
+        if response.status_code == 200 and response.is_json:
+            after = snapshot_outputs()
+            files = sorted(rel for rel, stat in after.items() if before.get(rel) != stat)
+            os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+            store_build_cache(entry_dir, files, response.get_json(), response.status_code)
+        return response
+    return wrapper
+
 # 型リスト取得
 def get_type_lists():
     basic_types = ['int', 'float', 'bool', 'string', 'double', 'byte', 'char', 'short', 'long', 'decimal', 'object']
@@ -77,33 +832,74 @@ def get_json_data_id(name):
     data_id = json.load(open(os.path.join(DATA_DIR, CLASS_DATA_ID,f"{name}", f"{name}.json"))) if os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID,f"{name}", f"{name}.json")) else []
     return data_id
 
-
-# ディレクトリ作成
-for dir_name in [ENUM, CLASS_DATA, STATE_DATA, CLASS_DATA_ID]:
-    dir_path = os.path.join(DATA_DIR, dir_name)
-    if not os.path.exists(dir_path):
-        logger.info(f"Creating directory: {dir_path}")
-        os.makedirs(dir_path)
-        
-# ベースファイルの作成
-if not  os.path.exists(os.path.join(DATA_DIR, ENUM, "enum_list.json")):
-    with open(os.path.join(DATA_DIR, ENUM, "enum_list.json"), 'w', encoding='utf-8') as f:
-        json.dump([], f)
-        
-if not  os.path.exists(os.path.join(DATA_DIR, CLASS_DATA, "class_list.json")):
-    with open(os.path.join(DATA_DIR, CLASS_DATA, "class_list.json"), 'w', encoding='utf-8') as f:
-        json.dump([], f)
-        
-if not  os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "class_data_id_list.json")):
-    with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "class_data_id_list.json"), 'w', encoding='utf-8') as f:
-        json.dump([], f)
-        
-if not  os.path.exists(os.path.join(DATA_DIR, STATE_DATA, "state_list.json")):
-    with open(os.path.join(DATA_DIR, STATE_DATA, "state_list.json"), 'w', encoding='utf-8') as f:
-        json.dump([], f)
-
-if not os.path.exists(os.path.join(DATA_DIR, STATE_DATA, "BaseState.cs")):
-    code_str = """
+# 行IDが1からの連番か判定（連番なら配列テーブルを生成できる）
+def is_contiguous_ids(rows):
+    try:
+        ids = [int(row['id']) for row in rows]
+    except (KeyError, TypeError, ValueError):
+        return False
+    return ids == list(range(1, len(ids) + 1))
+
+
+# 生成済みファイルと内容が同じなら書き込まない（タイムスタンプが変わるとUnityが再インポートするため）
+def write_if_changed(path, content):
+    # テキストモードの書き込みと同じ改行コードにそろえる
+    data = content.replace('\n', os.linesep).encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if hashlib.blake2b(f.read(), digest_size=16).digest() == hashlib.blake2b(data, digest_size=16).digest():
+                return False
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+# DATA_DIR の初期ファイル作成。import時ではなく最初のリクエスト（または起動時）に一度だけ実行する
+_data_dir_initialized = False
+_data_dir_init_lock = threading.Lock()
+
+def init_data_dir():
+    global _data_dir_initialized
+    if _data_dir_initialized:
+        return
+    with _data_dir_init_lock:
+        if _data_dir_initialized:
+            return
+        started = time.perf_counter()
+        _bootstrap_data_dir()
+        _data_dir_initialized = True
+        logger.info(f"Initialized {DATA_DIR} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+@app.before_request
+def ensure_data_dir():
+    init_data_dir()
+
+def _bootstrap_data_dir():
+    # ディレクトリ作成
+    for dir_name in [ENUM, CLASS_DATA, STATE_DATA, CLASS_DATA_ID]:
+        dir_path = os.path.join(DATA_DIR, dir_name)
+        if not os.path.exists(dir_path):
+            logger.info(f"Creating directory: {dir_path}")
+            os.makedirs(dir_path)
+
+    # ベースファイルの作成
+    if not  os.path.exists(os.path.join(DATA_DIR, ENUM, "enum_list.json")):
+        with open(os.path.join(DATA_DIR, ENUM, "enum_list.json"), 'w', encoding='utf-8') as f:
+            json.dump([], f)
+
+    if not  os.path.exists(os.path.join(DATA_DIR, CLASS_DATA, "class_list.json")):
+        with open(os.path.join(DATA_DIR, CLASS_DATA, "class_list.json"), 'w', encoding='utf-8') as f:
+            json.dump([], f)
+
+    if not  os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "class_data_id_list.json")):
+        with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "class_data_id_list.json"), 'w', encoding='utf-8') as f:
+            json.dump([], f)
+
+    if not  os.path.exists(os.path.join(DATA_DIR, STATE_DATA, "state_list.json")):
+        with open(os.path.join(DATA_DIR, STATE_DATA, "state_list.json"), 'w', encoding='utf-8') as f:
+            json.dump([], f)
+
+    if not os.path.exists(os.path.join(DATA_DIR, STATE_DATA, "BaseState.cs")):
+        code_str = """
         private bool is_active = true;
         public bool IsActive => is_active;
 
@@ -121,20 +917,20 @@ if not os.path.exists(os.path.join(DATA_DIR, STATE_DATA, "BaseState.cs")):
             return default;
         }
 """
-    with open(os.path.join(DATA_DIR, STATE_DATA, "BaseState.cs"), 'w', encoding='utf-8') as f:
-        f.write(f"using GameCore.States.Managers;\nusing System;\nnamespace GameCore.States\n{{\n    public abstract class  BaseState<E,T>where E : Enum where T : BaseStateManagerData<E>\n    {{{code_str}\n    }}\n}}\n")
+        with open(os.path.join(DATA_DIR, STATE_DATA, "BaseState.cs"), 'w', encoding='utf-8') as f:
+            f.write(f"using GameCore.States.Managers;\nusing System;\nnamespace GameCore.States\n{{\n    public abstract class  BaseState<E,T>where E : Enum where T : BaseStateManagerData<E>\n    {{{code_str}\n    }}\n}}\n")
 
-STATE_BRANCH = os.path.join(DATA_DIR, STATE_DATA)
+    STATE_BRANCH = os.path.join(DATA_DIR, STATE_DATA)
 
 
-os.makedirs(STATE_BRANCH, exist_ok=True)
+    os.makedirs(STATE_BRANCH, exist_ok=True)
 
 
-files_content = {
+    files_content = {
 
 
-    # BaseStateControl
-    os.path.join(STATE_BRANCH, "BaseStateControl.cs"): """namespace GameCore.States.Control
+        # BaseStateControl
+        os.path.join(STATE_BRANCH, "BaseStateControl.cs"): """namespace GameCore.States.Control
 {
     public abstract class BaseStateControl<T, E, F>
         where T : Enum
@@ -196,8 +992,8 @@ files_content = {
 }
 """,
 
-    # BaseStateManagerData
-    os.path.join(STATE_BRANCH, "BaseStateManagerData.cs"): """namespace GameCore.States.Managers
+        # BaseStateManagerData
+        os.path.join(STATE_BRANCH, "BaseStateManagerData.cs"): """namespace GameCore.States.Managers
 {
     public abstract class BaseStateManagerData<T> where T : Enum
     {
@@ -243,23 +1039,21 @@ files_content = {
     }
 }
 """
-}
+    }
 
-# ファイル生成
-for path, content in files_content.items():
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("using System;\n")
-            f.write("using System.Collections.Generic;\n")
-            f.write(content)
-        print(f"Created: {path}")
-    else:
-        print(f"Skipped (exists): {path}")
+    # ファイル生成
+    for path, content in files_content.items():
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("using System;\n")
+                f.write("using System.Collections.Generic;\n")
+                f.write(content)
+            logger.info(f"Created: {path}")
 
 
-# BaseClassDataRow.cs を生成
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataRow.cs")):
-    code_str = """
+    # BaseClassDataRow.cs を生成
+    if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataRow.cs")):
+        code_str = """
     using System.IO;
 
     namespace GameCore.Tables
@@ -270,12 +1064,12 @@ if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataRow.cs
         }
     }
     """
-    with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataRow.cs"), 'w', encoding='utf-8') as f:
-        f.write(code_str.strip() + "\n")
+        with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataRow.cs"), 'w', encoding='utf-8') as f:
+            f.write(code_str.strip() + "\n")
 
-# BaseClassDataID.cs を生成
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataID.cs")):
-    code_str = """
+    # BaseClassDataID.cs を生成
+    if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataID.cs")):
+        code_str = """
     using System.IO;
     using System;
     using System.Collections.Generic;
@@ -293,11 +1087,46 @@ if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataID.cs"
         }
     }
     """
-    with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataID.cs"), 'w', encoding='utf-8') as f:
-        f.write(code_str.strip() + "\n")
-        
-# BaseTable.cs を生成
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseTable.cs")):
+        with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseClassDataID.cs"), 'w', encoding='utf-8') as f:
+            f.write(code_str.strip() + "\n")
+
+    # ClassDataStringPool.cs を生成（並列読み込み対応のため既存プロジェクトでも内容が違えば更新する）
+    code_str = """
+    using System.IO;
+    using System.Text;
+
+    namespace GameCore.Tables
+    {
+        public static class ClassDataStringPool
+        {
+            // 読み込み中のコンテナの文字列プール（Header.GetData/LoadAsyncで切り替え）
+            // 並列読み込みに対応するためスレッドごとに保持する
+            [System.ThreadStatic]
+            public static string[] Current;
+
+            public static string[] Read(BinaryReader reader)
+            {
+                int count = reader.ReadInt32();
+                var strings = new string[count];
+                for (int i = 0; i < count; i++)
+                {
+                    int len = reader.ReadInt32();
+                    strings[i] = Encoding.UTF8.GetString(reader.ReadBytes(len));
+                }
+                return strings;
+            }
+
+            public static string Get(int index)
+            {
+                var strings = Current;
+                return strings != null && (uint)index < (uint)strings.Length ? strings[index] : string.Empty;
+            }
+        }
+    }
+    """
+    write_if_changed(os.path.join(DATA_DIR, CLASS_DATA_ID, "ClassDataStringPool.cs"), code_str.strip() + "\n")
+
+    # BaseTable.cs を生成（Decode/Publish追加のため既存プロジェクトでも内容が違えば更新する）
     code_str = """
     using System.IO;
     using System;
@@ -311,53 +1140,59 @@ if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseTable.cs")):
             public abstract void Read(BinaryReader reader);
             public abstract void Release();
 
+            // 静的なTable等には反映せずに読み込む（LoadAllAsyncのワーカースレッド用）
+            public virtual void Decode(BinaryReader reader) { Read(reader); }
+            // Decodeした内容を静的なTable等へ反映する
+            public virtual void Publish() { }
+
         }
     }
     """
-    with open(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseTable.cs"), 'w', encoding='utf-8') as f:
-        f.write(code_str.strip() + "\n")
-
-
-# --- BaseStateBranch.cs ---
-base_branch_path = os.path.join(DATA_DIR, STATE_BRANCH, 'BaseStateBranch.cs')
-with open(base_branch_path, 'w', encoding='utf-8') as f:
-    f.write('using System;\n')
-    f.write('using UnityEngine;\n')
-    f.write('using GameCore.States.Managers;\n\n')
-    f.write('namespace GameCore.States.Branch\n{\n')
-    f.write('    public abstract class BaseStateBranch<TStateId, TManagerData, TState, TDetailState>\n')
-    f.write('        where TStateId : Enum\n')
-    f.write('        where TManagerData : BaseStateManagerData<TStateId>\n')
-    f.write('        where TState : BaseState<TStateId, TManagerData>\n')
-    f.write('        where TDetailState : BaseDetailStateBranch<TStateId, TManagerData, TState>\n')
-    f.write('    {\n')
-    f.write('        public abstract TStateId ConditionsBranch(TManagerData manager_data, TState state);\n')
-    f.write('        public abstract TDetailState Factory(TStateId id);\n')
-    f.write('    }\n')
-    f.write('}\n')
-# --- BaseDetailStateBranch.cs ---
-base_detail_path = os.path.join(DATA_DIR, STATE_BRANCH, 'BaseDetailStateBranch.cs')
-with open(base_detail_path, 'w', encoding='utf-8') as f:
-    f.write('using System;\n')
-    f.write('using UnityEngine;\n')
-    f.write('using GameCore.States.Managers;\n\n')
-    f.write('namespace GameCore.States.Branch\n{\n')
-    f.write('    public abstract class BaseDetailStateBranch<TStateId, TManagerData, TState>\n')
-    f.write('        where TStateId : Enum\n')
-    f.write('        where TManagerData : BaseStateManagerData<TStateId>\n')
-    f.write('        where TState : BaseState<TStateId, TManagerData>\n')
-    f.write('    {\n')
-    f.write('        public abstract TStateId ConditionsBranch(TManagerData manager_data, TState state);\n')
-    f.write('    }\n')
-    f.write('}\n')
-    
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID)):
-    os.makedirs(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID))
-    
-    
-# BaseTable.cs を生成
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseTableMatrix.cs")):
-    code_str = """
+    write_if_changed(os.path.join(DATA_DIR, CLASS_DATA_ID, "BaseTable.cs"), code_str.strip() + "\n")
+
+
+    # --- BaseStateBranch.cs ---
+    base_branch_path = os.path.join(DATA_DIR, STATE_BRANCH, 'BaseStateBranch.cs')
+    write_if_changed(base_branch_path, (
+        'using System;\n'
+        'using UnityEngine;\n'
+        'using GameCore.States.Managers;\n\n'
+        'namespace GameCore.States.Branch\n{\n'
+        '    public abstract class BaseStateBranch<TStateId, TManagerData, TState, TDetailState>\n'
+        '        where TStateId : Enum\n'
+        '        where TManagerData : BaseStateManagerData<TStateId>\n'
+        '        where TState : BaseState<TStateId, TManagerData>\n'
+        '        where TDetailState : BaseDetailStateBranch<TStateId, TManagerData, TState>\n'
+        '    {\n'
+        '        public abstract TStateId ConditionsBranch(TManagerData manager_data, TState state);\n'
+        '        public abstract TDetailState Factory(TStateId id);\n'
+        '    }\n'
+        '}\n'
+    ))
+    # --- BaseDetailStateBranch.cs ---
+    base_detail_path = os.path.join(DATA_DIR, STATE_BRANCH, 'BaseDetailStateBranch.cs')
+    write_if_changed(base_detail_path, (
+        'using System;\n'
+        'using UnityEngine;\n'
+        'using GameCore.States.Managers;\n\n'
+        'namespace GameCore.States.Branch\n{\n'
+        '    public abstract class BaseDetailStateBranch<TStateId, TManagerData, TState>\n'
+        '        where TStateId : Enum\n'
+        '        where TManagerData : BaseStateManagerData<TStateId>\n'
+        '        where TState : BaseState<TStateId, TManagerData>\n'
+        '    {\n'
+        '        public abstract TStateId ConditionsBranch(TManagerData manager_data, TState state);\n'
+        '    }\n'
+        '}\n'
+    ))
+
+    if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID)):
+        os.makedirs(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID))
+
+
+    # BaseTable.cs を生成
+    if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseTableMatrix.cs")):
+        code_str = """
     using System.IO;
     using System;
     using System.Collections.Generic;
@@ -373,12 +1208,12 @@ if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseTableMat
         }
     }
     """
-    with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseTableMatrix.cs"), 'w', encoding='utf-8') as f:
-        f.write(code_str.strip() + "\n")
+        with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseTableMatrix.cs"), 'w', encoding='utf-8') as f:
+            f.write(code_str.strip() + "\n")
 
-# BaseClassDataMatrixID.cs 生成 (初回のみ)
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixID.cs")):
-    code_str = """
+    # BaseClassDataMatrixID.cs 生成 (初回のみ)
+    if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixID.cs")):
+        code_str = """
     using System.IO;
     using System;
     using System.Collections.Generic;
@@ -396,12 +1231,12 @@ if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDat
         }
     }
     """
-    with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixID.cs"), 'w', encoding='utf-8') as f:
-        f.write(code_str.strip() + "\n")
+        with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixID.cs"), 'w', encoding='utf-8') as f:
+            f.write(code_str.strip() + "\n")
 
-# BaseClassDataMatrixRow.cs 生成
-if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixRow.cs")):
-    code_str = """
+    # BaseClassDataMatrixRow.cs 生成
+    if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixRow.cs")):
+        code_str = """
     using System.IO;
 
     namespace GameCore.Tables
@@ -412,8 +1247,372 @@ if not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDat
         }
     }
     """
-    with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixRow.cs"), 'w', encoding='utf-8') as f:
-        f.write(code_str.strip() + "\n")
+        with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, "BaseClassDataMatrixRow.cs"), 'w', encoding='utf-8') as f:
+            f.write(code_str.strip() + "\n")
+
+
+# リソース（DATA_DIRからの相対パス）ごとの読み書きロック
+# 読み込みは並列、同じリソースへの書き込みは直列。書き込み待ちがあれば新しい読み込みは待たせる
+class ReadWriteLock:
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+class ResourceLockManager:
+    def __init__(self):
+        self._locks = {}
+        self._mutex = threading.Lock()
+
+    def get(self, key):
+        with self._mutex:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = ReadWriteLock()
+            return lock
+
+    # [(キー, 'read' | 'write')] を順に取得し、解放用の関数を返す
+    def acquire(self, requests):
+        acquired = []
+        try:
+            for key, mode in requests:
+                lock = self.get(key)
+                if mode == 'write':
+                    lock.acquire_write()
+                    acquired.append(lock.release_write)
+                else:
+                    lock.acquire_read()
+                    acquired.append(lock.release_read)
+        except BaseException:
+            for release in reversed(acquired):
+                release()
+            raise
+
+        def release_all():
+            for release in reversed(acquired):
+                release()
+        return release_all
+
+resource_locks = ResourceLockManager()
+
+# データ全体を表すキー。個別リソースの読み書きは共有で、生成・差分処理は排他で取る
+DATA_ROOT_LOCK = '.'
+# 一覧（リスト）APIのリソースキーとファイル、ドキュメントAPIのリソースキーとファイル名
+RESOURCE_LIST_ROUTES = {
+    '/api/enum-id': (ENUM, 'enum_list.json'),
+    '/api/class-data': (CLASS_DATA, 'class_list.json'),
+    '/api/class-data-id': (CLASS_DATA_ID, 'class_data_id_list.json'),
+    '/api/class-data-matrix-id': (CLASS_DATA_MATRIX_ID, 'class_data_matrix_id_list.json'),
+    '/api/state-data': (STATE_DATA, 'state_list.json'),
+    '/api/build-settings': (BUILD_SETTINGS_FILE, None),
+}
+RESOURCE_DOCUMENT_ROUTES = {
+    '/api/enum/<name>': (ENUM, '{name}.json'),
+    '/api/class-data/<name>': (CLASS_DATA, '{name}.class.json'),
+    '/api/class-data-id/<name>': (CLASS_DATA_ID, '{name}.json'),
+    '/api/class-data-matrix-id/<name>': (CLASS_DATA_MATRIX_ID, '{name}.json'),
+    '/api/state-data/<name>': (STATE_DATA, '{name}.state.json'),
+}
+
+# ルートが扱うJSONファイル（一覧・ドキュメント以外はNone）
+def get_resource_file(rule, view_args):
+    if rule in RESOURCE_LIST_ROUTES:
+        key, file_name = RESOURCE_LIST_ROUTES[rule]
+        return os.path.join(DATA_DIR, key, file_name) if file_name else os.path.join(DATA_DIR, key)
+    if rule in RESOURCE_DOCUMENT_ROUTES:
+        key, file_name = RESOURCE_DOCUMENT_ROUTES[rule]
+        name = view_args.get('name', '')
+        return os.path.join(DATA_DIR, key, name, file_name.format(name=name))
+    return None
+
+# リクエストが取るロック: GETは読み込み、それ以外は書き込み。生成系（その他の /api/）はデータ全体を排他
+# 一覧とドキュメントの両方を書き換える処理（一覧への追加・削除、ドキュメントの削除）は一覧 -> ドキュメントの順で取る
+def get_request_locks(rule, method, view_args, body_name=None):
+    write = method not in ('GET', 'HEAD', 'OPTIONS')
+    if rule in RESOURCE_LIST_ROUTES:
+        kind = RESOURCE_LIST_ROUTES[rule][0]
+        locks = [(DATA_ROOT_LOCK, 'read'), (kind, 'write' if write else 'read')]
+        # POST は作成、PATCH は削除（ディレクトリごと）するドキュメント
+        if write and RESOURCE_LIST_ROUTES[rule][1] and isinstance(body_name, str) and body_name:
+            locks.append((f"{kind}/{body_name}", 'write'))
+        return locks
+    if rule in RESOURCE_DOCUMENT_ROUTES:
+        kind = RESOURCE_DOCUMENT_ROUTES[rule][0]
+        key = f"{kind}/{view_args.get('name', '')}"
+        if method == 'DELETE':
+            # 削除は一覧ファイルも書き換える
+            return [(DATA_ROOT_LOCK, 'read'), (kind, 'write'), (key, 'write')]
+        return [(DATA_ROOT_LOCK, 'read'), (key, 'write' if write else 'read')]
+    return [(DATA_ROOT_LOCK, 'write')]
+
+# 一覧APIのPOST/PATCHの対象名（本文の name）
+def get_request_body_name():
+    body = request.get_json(silent=True)
+    return body.get('name') if isinstance(body, dict) else None
+
+@app.before_request
+def acquire_resource_locks():
+    if request.url_rule is None or not request.url_rule.rule.startswith('/api/'):
+        return
+    rule = request.url_rule.rule
+    body_name = get_request_body_name() if rule in RESOURCE_LIST_ROUTES and request.method in ('POST', 'PATCH') else None
+    g.release_resource_locks = resource_locks.acquire(get_request_locks(rule, request.method, request.view_args or {}, body_name))
+
+@app.teardown_request
+def release_resource_locks(exc=None):
+    release = g.pop('release_resource_locks', None)
+    if release is not None:
+        release()
+
+# 楽観的排他: 一覧・ドキュメントのJSONは内容ハッシュをETagとして返し、更新時はIf-Matchと照合する（不一致は409）
+# 既存ドキュメントの更新・削除はIf-Match必須（無ければ428）。CHIGADIO_REQUIRE_IF_MATCH=0 で任意にできる
+REQUIRE_IF_MATCH_ENV = 'CHIGADIO_REQUIRE_IF_MATCH'
+
+# 一覧・ドキュメントJSONのキャッシュ {パス: ((mtime, サイズ), ETag, GETのレスポンス本文 or None)}
+# ファイルの (mtime, サイズ) が変わらない限り、ETagの再計算・ファイル読み込み・JSONエンコードを省く
+_document_cache = {}
+
+def get_document_stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size) if os.path.isfile(path) else None
+
+def get_resource_etag(path):
+    stat = get_document_stat(path)
+    if stat is None:
+        return None
+    cached = _document_cache.get(path)
+    if cached is not None and cached[0] == stat:
+        return cached[1]
+    with open(path, 'rb') as f:
+        etag = '"' + hashlib.blake2b(f.read(), digest_size=16).hexdigest() + '"'
+    _document_cache[path] = (stat, etag, None)
+    return etag
+
+def set_document_headers(response, path, etag):
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(_document_cache[path][0][0] / 1e9)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# If-Matchは強い比較（W/付きは一致しない）、If-None-Matchは弱い比較（RFC 9110 13.1.1, 13.1.2）
+def if_match_satisfied(if_match, etag, weak=False):
+    tags = [tag.strip() for tag in if_match.split(',')]
+    if etag is None:
+        return False
+    if weak:
+        tags = [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+    return '*' in tags or etag in tags
+
+@app.before_request
+def check_if_match():
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or request.url_rule is None:
+        return
+    path = get_resource_file(request.url_rule.rule, request.view_args or {})
+    if path is None:
+        return
+    if_match = request.headers.get('If-Match')
+    etag = get_resource_etag(path)
+    if if_match is None:
+        # まだ無いドキュメントの作成と一覧の更新はIf-Match無しでも許可
+        if (etag is not None and request.url_rule.rule in RESOURCE_DOCUMENT_ROUTES
+                and os.environ.get(REQUIRE_IF_MATCH_ENV, '1') != '0'):
+            return jsonify({"error": "If-Match header is required", "etag": etag}), 428
+        return
+    if not if_match_satisfied(if_match, etag):
+        response = jsonify({"error": "Document was modified by another request", "etag": etag})
+        response.status_code = 409
+        if etag:
+            response.headers['ETag'] = etag
+        return response
+
+# レスポンス圧縮: /api のレスポンスは一定サイズ以上ならAccept-Encodingに応じて圧縮して送る
+# 静的ファイルはビルド時に作った .br / .gz があればそれを送る（precompress_static / --precompress-static）
+COMPRESS_MIN_SIZE = 1024
+PRECOMPRESS_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.map', '.txt', '.ico')
+# ファイル名にハッシュを含む静的ファイル（main.1a2b3c4d.js 等）は内容が変わらないため長期キャッシュ
+IMMUTABLE_ASSET_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.')
+CONTENT_ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+def get_available_encodings():
+    return ['br', 'gzip'] if get_optional_module('brotli') is not None else ['gzip']
+
+def negotiate_encoding(candidates):
+    return request.accept_encodings.best_match(candidates) if candidates else None
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return get_optional_module('brotli').compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+# 登録順の逆に実行されるため、ETag付与（attach_etag）より先に登録して最後に圧縮する
+@app.after_request
+def compress_api_response(response):
+    if not request.path.startswith('/api/') or request.method == 'HEAD' or response.status_code in (204, 304):
+        return response
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    length = response.calculate_content_length()
+    if length is None or length < COMPRESS_MIN_SIZE:
+        return response
+    encoding = negotiate_encoding(get_available_encodings())
+    if encoding is None:
+        return response
+    # 長さが分かるレスポンス（本文を生成済み）のみが対象なので、まとめて圧縮する
+    response.set_data(compress_body(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # 圧縮後のバイト列は別表現のため弱いETagにする
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        response.headers['ETag'] = 'W/' + etag
+    return response
+
+# ビルド済みの静的ファイルに .gz / .br を作る（元ファイルより新しければ作り直さない）
+def precompress_static(folder=None):
+    folder = folder or STATIC_FOLDER
+    written = 0
+    for root, dirs, files in os.walk(folder):
+        for file in files:
+            if not file.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, file)
+            if os.path.getsize(path) < COMPRESS_MIN_SIZE:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            compressors = {'.gz': lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+            brotli = get_optional_module('brotli')
+            if brotli is not None:
+                compressors['.br'] = lambda d: brotli.compress(d, quality=11)
+            for suffix, compress in compressors.items():
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compress(data))
+                written += 1
+    logger.info(f"Precompressed {written} static files in {folder}")
+    return written
+
+# 静的ファイルの送信（事前圧縮ファイルの選択とキャッシュヘッダ）
+def send_static_asset(path):
+    full_path = os.path.join(app.static_folder, path)
+    candidates = [e for e in get_available_encodings() if os.path.exists(full_path + CONTENT_ENCODING_SUFFIXES[e])]
+    encoding = negotiate_encoding(candidates)
+    if encoding is not None:
+        response = send_from_directory(app.static_folder, path + CONTENT_ENCODING_SUFFIXES[encoding])
+        response.headers['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(app.static_folder, path)
+    response.vary.add('Accept-Encoding')
+    if IMMUTABLE_ASSET_PATTERN.search(os.path.basename(path)):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# 条件付きGET: If-None-Match（無ければIf-Modified-Since）が一致すれば304、キャッシュ済みの本文があればそのまま返す
+@app.before_request
+def serve_cached_document():
+    if request.method != 'GET' or request.url_rule is None:
+        return
+    path = get_resource_file(request.url_rule.rule, request.view_args or {})
+    etag = get_resource_etag(path) if path is not None else None
+    if etag is None:
+        return
+    stat, _, body = _document_cache[path]
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        not_modified = if_match_satisfied(if_none_match, etag, weak=True)
+    else:
+        since = parse_date(request.headers.get('If-Modified-Since'))
+        not_modified = since is not None and int(stat[0] // 1_000_000_000) <= since.timestamp()
+    metrics.cache_result('document', not_modified or body is not None)
+    if not_modified:
+        return set_document_headers(app.response_class(status=304), path, etag)
+    if body is not None:
+        return set_document_headers(app.response_class(body, mimetype='application/json'), path, etag)
+
+@app.after_request
+def attach_etag(response):
+    if request.url_rule is None or response.status_code >= 300:
+        return response
+    path = get_resource_file(request.url_rule.rule, request.view_args or {})
+    etag = get_resource_etag(path) if path is not None else None
+    if etag:
+        # GETの本文はファイルが変わるまで再利用する（読み込みロック中なのでファイルは変わっていない）
+        if request.method == 'GET' and response.status_code == 200 and not response.direct_passthrough:
+            stat = _document_cache[path][0]
+            _document_cache[path] = (stat, etag, response.get_data())
+        set_document_headers(response, path, etag)
+    return response
+
+# ビルド設定
+@app.route('/api/build-settings', methods=['GET', 'POST'])
+def manage_build_settings():
+    file_path = os.path.join(DATA_DIR, BUILD_SETTINGS_FILE)
+    if request.method == 'GET':
+        try:
+            return jsonify(get_build_settings())
+        except Exception as e:
+            logger.error(f"Error reading build settings: {str(e)}")
+            return jsonify({"error": str(e)}), 500
+    elif request.method == 'POST':
+        try:
+            new_settings = request.get_json()
+            if not isinstance(new_settings, dict):
+                return jsonify({"error": "Build settings must be an object"}), 400
+            unknown = [key for key in new_settings if key not in DEFAULT_BUILD_SETTINGS]
+            if unknown:
+                return jsonify({"error": f"Unknown build settings: {', '.join(unknown)}"}), 400
+            # 選択式の設定は候補のいずれか、それ以外は既定値と同じ型
+            choices = {'compression': list(COMPRESSION_CODECS), 'matrix_storage': list(MATRIX_STORAGE_MODES)}
+            for key, value in new_settings.items():
+                if key in choices:
+                    if value not in choices[key]:
+                        return jsonify({"error": f"Invalid {key}: {value!r} (expected one of {', '.join(choices[key])})"}), 400
+                elif type(value) is not type(DEFAULT_BUILD_SETTINGS[key]):
+                    return jsonify({"error": f"Invalid {key}: {value!r} (expected {type(DEFAULT_BUILD_SETTINGS[key]).__name__})"}), 400
+            settings = get_build_settings()
+            settings.update(new_settings)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(settings, f, ensure_ascii=False, indent=2)
+            logger.info("Saved build settings")
+            return jsonify({"message": "Build settings saved", "data": settings})
+        except Exception as e:
+            logger.error(f"Error saving build settings: {str(e)}")
+            return jsonify({"error": str(e)}), 500
+
 # Enum-ID管理
 @app.route('/api/enum-id', methods=['GET', 'POST', 'PATCH'])
 def manage_enum_id():
@@ -422,7 +1621,7 @@ def manage_enum_id():
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning enum-id: {data}")
+            logger.debug("Returning enum-id: %s", PayloadSummary(data))
             return jsonify(data)
         except FileNotFoundError:
             return jsonify([]), 404
@@ -478,7 +1677,7 @@ def manage_enum_detail(name):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning enum data for {name}: {data}")
+            logger.debug("Returning enum data for %s: %s", name, PayloadSummary(data))
             return jsonify(data)
         except FileNotFoundError:
             return jsonify([]), 404
@@ -514,10 +1713,11 @@ def manage_enum_detail(name):
             return jsonify({"error": str(e)}), 500
 
 @app.route('/api/generate-enum/<name>', methods=['POST'])
+@build_cached
 def generate_enum_cs(name):
     try:
         data = request.get_json()
-        logger.debug(f"Generating C# enum for {name}: {data}")
+        logger.debug("Generating C# enum for %s: %s", name, PayloadSummary(data))
         valid_data = [item for item in data if not isnan(item['value']) and isfinite(item['value'])]
         cs_content = "namespace GameCore.Enums\n{\n"
         cs_content += f"    public enum {name}\n    {{\n"
@@ -543,7 +1743,7 @@ def manage_class_data():
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning class-data: {data}")
+            logger.debug("Returning class-data: %s", PayloadSummary(data))
             return jsonify(data)
         except FileNotFoundError:
             return jsonify([]), 404
@@ -571,6 +1771,7 @@ def manage_class_data():
             os.makedirs(new_directory_path, exist_ok=True)
             with open(os.path.join(new_directory_path, f"{new_class['name']}.class.json"), 'w', encoding='utf-8') as f:
                 json.dump([], f, ensure_ascii=False, indent=2)
+            invalidate_class_layouts()
             logger.info(f"Added class-data: {new_class['name']}")
             return jsonify({"message": f"Class {new_class['name']} created successfully", "data": new_class_entry})
         except Exception as e:
@@ -584,6 +1785,7 @@ def manage_class_data():
             data = [item for item in data if item['name'] != delete_name]
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            invalidate_class_layouts()
             logger.info(f"Removed class: {delete_name}")
             return jsonify({"message": f"Class {delete_name} removed from class_list.json"})
         except FileNotFoundError:
@@ -596,12 +1798,12 @@ def manage_class_data():
 @app.route('/api/class-data/<name>', methods=['GET', 'POST', 'DELETE'])
 def manage_class_detail(name):
     file_path = os.path.join(DATA_DIR, CLASS_DATA, name, f'{name}.class.json')
-    logger.debug(f"Handling /api/class-data/{name} with method: {request.method}")
+    logger.debug("Handling /api/class-data/%s with method: %s", name, request.method)
     if request.method == 'GET':
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning class data for {name}: {data}")
+            logger.debug("Returning class data for %s: %s", name, PayloadSummary(data))
             return jsonify(data)
         except FileNotFoundError:
             logger.warning(f"{name}.class.json not found at {file_path}")
@@ -612,10 +1814,11 @@ def manage_class_detail(name):
     elif request.method == 'POST':
         try:
             data = request.get_json()
-            logger.debug(f"POST data for class {name}: {data}")
+            logger.debug("POST data for class %s: %s", name, PayloadSummary(data))
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            invalidate_class_layouts()
             logger.info(f"Saved class data for {name}")
             return jsonify({"message": f"{name}.class.json saved successfully"})
         except Exception as e:
@@ -626,6 +1829,7 @@ def manage_class_detail(name):
             if os.path.exists(file_path):
                 os.remove(file_path)
                 os.rmdir(os.path.join(DATA_DIR, CLASS_DATA, name))
+                invalidate_class_layouts()
                 class_list_path = os.path.join(DATA_DIR, CLASS_DATA, 'class_list.json')
                 with open(class_list_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
@@ -642,6 +1846,7 @@ def manage_class_detail(name):
 
 # ClassData C#生成
 @app.route('/api/generate-class/<name>', methods=['POST'])
+@build_cached
 def generate_class_cs(name):
     try:
         data = request.get_json()
@@ -664,13 +1869,12 @@ def generate_class_cs(name):
                 f.write(read_code)
             f.write("        }\n")
             f.write("    }\n}\n")
-            f.r
         return jsonify({"message": f"C# file generated: {cs_path}"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     try:
         data = request.get_json()
-        logger.debug(f"Generating C# class for {name}: {data}")
+        logger.debug("Generating C# class for %s: %s", name, PayloadSummary(data))
         enum_list, class_list = get_type_lists()
         basic_types = ['int', 'float', 'bool', 'string', 'double', 'byte', 'char', 'short', 'long', 'decimal', 'object']
         unity_types = ['GameObject', 'Transform', 'Vector2', 'Vector3', 'Vector4', 'Quaternion', 'Color', 'Rect', 'Bounds', 'Matrix4x4', 'AnimationCurve', 'Sprite', 'Texture', 'Material', 'Mesh', 'Rigidbody', 'Collider', 'AudioClip', 'ScriptableObject']
@@ -718,11 +1922,16 @@ def generate_class_cs(name):
         logger.error(f"Error generating {name}.cs: {str(e)}")
         return jsonify({"error": str(e)}), 500
     
-def generate_binary_data(name, json_data):
+def generate_binary_data(name, json_data, string_pool=None):
+    lap = metrics.phase_laps()
     binary_data = bytearray()
     rows = json_data.get('rows', [])
     columns = json_data.get('columns', [])
     basic_types, unity_types, enum_list, class_list, class_data_id_list = get_type_lists()
+    settings = get_build_settings()
+    narrow = settings['narrow_columns']
+    widths = get_column_widths(columns, enum_list, class_data_id_list) if narrow else {}
+    bool_columns = [col for col in columns if narrow and col['type'].lower() == 'bool']
     binary_data.extend(struct.pack('i', len(rows)))
     binary_data.extend(struct.pack('i', len(columns)))
     
@@ -735,13 +1944,18 @@ def generate_binary_data(name, json_data):
             enum_map.append((type_name, get_json_enum(type_name)))
         elif type_name in class_data_id_list:
             class_data_id_map.append((type_name, get_json_data_id(type_name)))
-    for col in columns:
-        name_encoded = col['name'].encode('utf-8')
-        type_encoded = col['type'].encode('utf-8')
-        binary_data.extend(struct.pack('i', len(name_encoded)))
-        binary_data.extend(name_encoded)
-        binary_data.extend(struct.pack('i', len(type_encoded)))
-        binary_data.extend(type_encoded)
+    lap('resolve_enums')
+    if settings['schema_fingerprint']:
+        # カラムメタの代わりにスキーマハッシュのみ（Read側で照合）
+        binary_data.extend(struct.pack('Q', get_schema_hash(columns, widths if narrow else None)))
+    else:
+        for col in columns:
+            name_encoded = col['name'].encode('utf-8')
+            type_encoded = col['type'].encode('utf-8')
+            binary_data.extend(struct.pack('i', len(name_encoded)))
+            binary_data.extend(name_encoded)
+            binary_data.extend(struct.pack('i', len(type_encoded)))
+            binary_data.extend(type_encoded)
     
     for row in rows:
         enum_val = row.get('enum_property', '')
@@ -750,7 +1964,12 @@ def generate_binary_data(name, json_data):
             binary_data.extend(struct.pack('i', enum_id))
         except (ValueError, IndexError):
             binary_data.extend(struct.pack('i', 0))
+        if bool_columns:
+            # boolは行の先頭にまとめてビットパック
+            binary_data.extend(pack_bool_flags([row['data'][col['name']]['value'] for col in bool_columns]))
         for col in columns:
+            if col in bool_columns:
+                continue
             cell = row['data'][col['name']]
             value = cell['value']
             type_ = col['type']
@@ -760,8 +1979,7 @@ def generate_binary_data(name, json_data):
                 if TYPE_MAP[type_.lower()]['pack'] is not None:
                     binary_data.extend(struct.pack(TYPE_MAP[type_.lower()]['pack'], value))
                 elif type_.lower() == 'string':
-                    encoded = value.encode('utf-8')
-                    binary_data.extend(struct.pack('i', len(encoded)) + encoded)
+                    binary_data.extend(pack_string(value, string_pool))
                 elif type_.lower() == 'vector2':
                     binary_data.extend(struct.pack('ff', *value))
                 elif type_.lower() == 'vector3':
@@ -773,9 +1991,9 @@ def generate_binary_data(name, json_data):
                     property_name = value.split('.')[-1] if '.' in value else value
                     matching_entry = next((entry for entry in enum_data if entry['property'] == property_name), None)
                     num_value = matching_entry['value'] if matching_entry else 0
-                    binary_data.extend(struct.pack('i', num_value))
+                    binary_data.extend(struct.pack(widths.get(col['name'], 'i'), num_value))
                 else:
-                    binary_data.extend(struct.pack('i', 0))
+                    binary_data.extend(struct.pack(widths.get(col['name'], 'i'), 0))
             elif type_ in [t for t, _ in class_data_id_map]:
                 # Handle class_data_id types
                 class_data = next((m for t, m in class_data_id_map if t == type_), None)
@@ -783,66 +2001,41 @@ def generate_binary_data(name, json_data):
                     property_name = value.split('.')[-1] if '.' in value else value
                     matching_entry = next((entry for entry in class_data['rows'] if entry['enum_property'] == property_name), None)
                     num_value = matching_entry['id'] if matching_entry else 0
-                    binary_data.extend(struct.pack('i', num_value))
+                    binary_data.extend(struct.pack(widths.get(col['name'], 'i'), num_value))
                 else:
-                    binary_data.extend(struct.pack('i', 0))
+                    binary_data.extend(struct.pack(widths.get(col['name'], 'i'), 0))
+            elif type_ in class_list:
+                # ClassDataはwrite_binary_fieldで展開
+                buffer = io.BytesIO()
+                write_binary_field(buffer, value, type_, enum_list, class_list, string_pool)
+                binary_data.extend(buffer.getvalue())
+    lap('encode')
     return binary_data
 
 @app.route('/api/generate-all-binary', methods=['POST'])
+@build_cached
 def generate_all_binary():
     try:
         all_binary_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'all_class_data.bin')
-        header = bytearray()
-        data_sections = bytearray()
+        settings = get_build_settings()
+        string_pool = {} if settings['string_pool'] else None
+        entries = []
         
         list_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'class_data_id_list.json')
-        with open(list_path, 'r', encoding='utf-8') as f:
+        with metrics.phase('load_json'), open(list_path, 'r', encoding='utf-8') as f:
             class_list = json.load(f)
         
-        header.extend(struct.pack('i', len(class_list)))
-        
-        offsets = {}
-        current_offset = 4 + sum(4 + 4 + len(item['name'].encode('utf-8')) + 8 + 4 for item in class_list)
-        
         for item in class_list:
             name = item['name']
-            id_ = item['id']
-            name_encoded = name.encode('utf-8')
-            
-            header.extend(struct.pack('i', id_))
-            header.extend(struct.pack('i', len(name_encoded)))
-            header.extend(name_encoded)
-            header.extend(struct.pack('q', 0))
-            header.extend(struct.pack('i', 0))
-            
             file_path = os.path.join(DATA_DIR, CLASS_DATA_ID, name, f'{name}.json')
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with metrics.phase('load_json'), open(file_path, 'r', encoding='utf-8') as f:
                 json_data = json.load(f)
-            section = generate_binary_data(name, json_data)
-            
-            offsets[name] = current_offset
-            current_offset += len(section)
-            data_sections.extend(section)
-        
-        with open(all_binary_path, 'wb') as f:
-            f.write(header)
-            f.write(data_sections)
+            entries.append((item['id'], name, generate_binary_data(name, json_data, string_pool)))
+        if string_pool is not None:
+            entries.insert(0, (STRING_POOL_SECTION_ID, STRING_POOL_SECTION, encode_string_pool(string_pool)))
         
-        with open(all_binary_path, 'r+b') as f:
-            pos = 4
-            for item in class_list:
-                name = item['name']
-                name_len = len(name.encode('utf-8'))
-                pos += 4 + 4 + name_len
-                
-                f.seek(pos)
-                f.write(struct.pack('q', offsets[name]))
-                
-                pos += 8
-                section_size = len(generate_binary_data(name, json_data))
-                f.write(struct.pack('i', section_size))
-                
-                pos += 4
+        with metrics.phase('write'), open(all_binary_path, 'wb') as f:
+            f.write(build_container(entries, settings['compression'], settings['patches']))
         
         logger.info("Generated all_class_data.bin")
         return jsonify({"message": "All binary generated successfully"})
@@ -850,7 +2043,25 @@ def generate_all_binary():
         logger.error(f"Error generating all binary: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# テーブル単位のパッチ生成（all_class_data.bin のビルドに対する差し替え）
+@app.route('/api/generate-patch/<name>', methods=['POST'])
+def generate_patch(name):
+    try:
+        file_path = os.path.join(DATA_DIR, CLASS_DATA_ID, name, f'{name}.json')
+        with open(file_path, 'r', encoding='utf-8') as f:
+            json_data = json.load(f)
+        version, patch_path = write_table_patch(CLASS_DATA_ID, 'all_class_data.bin', 'class_data_id_list.json', name,
+                                                lambda string_pool: generate_binary_data(name, json_data, string_pool))
+        logger.info(f"Generated patch {os.path.basename(patch_path)}")
+        return jsonify({"message": f"Patch generated for {name}", "version": version, "path": patch_path})
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        logger.error(f"Error generating patch for {name}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/generate-table-id', methods=['POST'])
+@build_cached
 def generate_table_id():
     try:
         table_id_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'TableID.cs')
@@ -876,6 +2087,7 @@ def generate_table_id():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/generate-all-enums', methods=['POST'])
+@build_cached
 def generate_all_enums():
     try:
         enum_list_path = os.path.join(DATA_DIR, ENUM, 'enum_list.json')
@@ -907,54 +2119,229 @@ def generate_all_enums():
         logger.error(f"Error generating all enums: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/generate-all-cs-header', methods=['POST'])
-def generate_all_cs_header():
-    try:
-        cs_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'ClassDataHeader.cs')
-        list_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'class_data_id_list.json')
-        with open(list_path, 'r', encoding='utf-8') as f:
-            class_list = json.load(f)
-        
-        cs_content = """
-using System;
-using System.IO;
-using System.Collections.Generic;
-using GameCore.Enums;
-
-namespace GameCore.Tables
-{
-    public class ClassDataHeader
-    {
-        public Dictionary<TableID, (string Name, long Offset, int Size)> Entries = new Dictionary<TableID, (string, long, int)>();
-
-        public ClassDataHeader(BinaryReader reader)
-        {
-            int count = reader.ReadInt32();
-            for(int i = 0; i < count; i++)
+# コンテナヘッダ（ClassDataHeader / ClassDataMatrixHeader）のC#コード生成
+# tables: [(TableIDの式, テーブルクラス名)]（LoadAllAsyncで生成するテーブル）
+def generate_cs_container_header(class_name, table_base, settings, tables=()):
+    compressed = COMPRESSION_CODECS[settings['compression']][1] is not None
+    entry_type = "(string Name, long Offset, int Size, int RawSize, byte Codec)" if compressed else "(string Name, long Offset, int Size)"
+    entry_new = "(string, long, int, int, byte)" if compressed else "(string, long, int)"
+    cs = "\nusing System;\nusing System.IO;\n"
+    if compressed:
+        cs += "using System.IO.Compression;\n"
+    cs += "using System.Collections.Generic;\nusing System.Threading.Tasks;\nusing GameCore.Enums;\n\n"
+    cs += "namespace GameCore.Tables\n{\n"
+    cs += f"    public class {class_name}\n    {{\n"
+    cs += f"        public Dictionary<TableID, {entry_type}> Entries = new Dictionary<TableID, {entry_new}>();\n"
+    cs += "        public string[] Strings = new string[0];\n"
+    cs += f"        // LoadAllAsyncで読み込んだテーブル（全セクションの読み込み完了後に差し替え）\n"
+    cs += f"        public Dictionary<TableID, {table_base}> Tables = new Dictionary<TableID, {table_base}>();\n"
+    patch_magic = int.from_bytes(PATCH_MAGIC, 'little')
+    cs += f"""        // ビルドハッシュ（パッチの適用先の照合用）と適用済みパッチの版
+        public const int BuildHashSectionId = {BUILD_HASH_SECTION_ID};
+        public const int PatchMagic = 0x{patch_magic:08X}; // "{PATCH_MAGIC.decode('ascii')}"
+        public ulong BuildHash;
+        public Dictionary<TableID, int> PatchVersions = new Dictionary<TableID, int>();
+"""
+    if compressed:
+        magic = int.from_bytes(COMPRESSED_CONTAINER_MAGIC, 'little')
+        cs += f"""        public const int Magic = 0x{magic:08X}; // "{COMPRESSED_CONTAINER_MAGIC.decode('ascii')}"
+
+        // 圧縮コーデック（ID -> 展開処理）。deflate以外のコーデックは読み込み前にここへ登録する
+        public static Dictionary<byte, Func<byte[], int, byte[]>> Codecs = new Dictionary<byte, Func<byte[], int, byte[]>>
+        {{
+            {{ {COMPRESSION_CODECS['deflate'][0]}, InflateRaw }},
+        }};
+"""
+    cs += f"\n        public {class_name}(BinaryReader reader)\n        {{\n"
+    if compressed:
+        cs += "            if (reader.ReadInt32() != Magic) throw new InvalidDataException(\"Not a compressed class data container\");\n"
+    cs += f"""            int count = reader.ReadInt32();
+            Entries = new Dictionary<TableID, {entry_type}>(count);
+"""
+    cs += """            for(int i = 0; i < count; i++)
             {
                 int id = reader.ReadInt32();
-                TableID tableId = (TableID)Enum.ToObject(typeof(TableID), id);
+                TableID tableId = (TableID)id;
                 int nameLen = reader.ReadInt32();
                 string name = new string(reader.ReadChars(nameLen));
                 long offset = reader.ReadInt64();
                 int size = reader.ReadInt32();
-                Entries[tableId] = (name, offset, size);
+"""
+    if compressed:
+        cs += "                int rawSize = reader.ReadInt32();\n"
+        cs += "                byte codec = reader.ReadByte();\n"
+        cs += "                Entries[tableId] = (name, offset, size, rawSize, codec);\n"
+    else:
+        cs += "                Entries[tableId] = (name, offset, size);\n"
+    cs += """            }
+            // 文字列プール（TableID.None）があれば一度だけデコード
+            if (Entries.TryGetValue(TableID.None, out var pool))
+            {
+                Strings = ClassDataStringPool.Read(OpenSection(pool, reader));
+            }
+            if (Entries.TryGetValue((TableID)BuildHashSectionId, out var build))
+            {
+                BuildHash = OpenSection(build, reader).ReadUInt64();
             }
         }
 
-        public TTable GetData<TTable>(TableID id, BinaryReader reader) where TTable : BaseTable,new()
-        {
+"""
+    cs += f"        public TTable GetData<TTable>(TableID id, BinaryReader reader) where TTable : {table_base}, new()\n"
+    cs += """        {
             if (!Entries.TryGetValue(id, out var entry)) return null;
-            reader.BaseStream.Seek(entry.Offset, SeekOrigin.Begin);
+            var section = OpenSection(entry, reader);
+            ClassDataStringPool.Current = Strings;
             TTable data = new TTable();
-            data.Read(reader);
+            data.Read(section);
             return data;
         }
 
+"""
+    cs += f"""        // テーブル単位のパッチを適用し、そのテーブルだけを差し替える
+        // 別ビルド向けのパッチは例外、適用済み以前の版は無視してnullを返す
+        public {table_base} ApplyPatch(BinaryReader patch)
+        {{
+            if (patch.ReadInt32() != PatchMagic) throw new InvalidDataException("Not a class data patch");
+            int version = patch.ReadInt32();
+            ulong baseHash = patch.ReadUInt64();
+            TableID id = (TableID)patch.ReadInt32();
+            int nameLen = patch.ReadInt32();
+            string name = new string(patch.ReadChars(nameLen));
+            byte codec = patch.ReadByte();
+            int size = patch.ReadInt32();
+            int rawSize = patch.ReadInt32();
+            int poolSize = patch.ReadInt32();
+            if (baseHash != BuildHash) throw new InvalidDataException($"Patch for {{name}} targets another build");
+            if (PatchVersions.TryGetValue(id, out var applied) && applied >= version) return null;
+            var data = CreateTable(id);
+            if (data == null) throw new NotSupportedException($"No table for patch {{name}}");
+            string[] strings = Strings;
+            if (poolSize > 0) strings = ClassDataStringPool.Read(new BinaryReader(new MemoryStream(patch.ReadBytes(poolSize))));
+            byte[] section = patch.ReadBytes(size);
+"""
+    if compressed:
+        cs += """            if (codec != 0)
+            {
+                if (!Codecs.TryGetValue(codec, out var decode))
+                    throw new NotSupportedException($"Unsupported section codec {codec}");
+                section = decode(section, rawSize);
+            }
+"""
+    else:
+        cs += """            if (codec != 0) throw new NotSupportedException($"Unsupported section codec {codec}");
+"""
+    cs += f"""            ClassDataStringPool.Current = strings;
+            data.Read(new BinaryReader(new MemoryStream(section)));
+            PatchVersions[id] = version;
+            var tables = new Dictionary<TableID, {table_base}>(Tables);
+            tables[id] = data;
+            Tables = tables;
+            return data;
+        }}
+
+"""
+    cs += f"""        // ワーカースレッドで1セクションを読み込む（スレッドごとに専用のFileStreamを開く）
+        public Task<TTable> LoadAsync<TTable>(string path, TableID id) where TTable : {table_base}, new()
+        {{
+            return Task.Run(() =>
+            {{
+                var data = (TTable)LoadSection(path, id, new TTable());
+                data?.Publish();
+                return data;
+            }});
+        }}
+
+        // 独立したセクションを並列に読み込み、全て揃ってからTablesを差し替える
+        public async Task<Dictionary<TableID, {table_base}>> LoadAllAsync(string path)
+        {{
+            var tasks = new Dictionary<TableID, Task<{table_base}>>(Entries.Count);
+            foreach (var id in Entries.Keys)
+            {{
+                var data = CreateTable(id);
+                if (data == null) continue;
+                tasks[id] = Task.Run(() => LoadSection(path, id, data));
+            }}
+            await Task.WhenAll(tasks.Values);
+            // ワーカーはDecodeのみ行うため、ここで全テーブルをまとめて公開する
+            var tables = new Dictionary<TableID, {table_base}>(tasks.Count);
+            foreach (var pair in tasks) tables[pair.Key] = pair.Value.Result;
+            foreach (var data in tables.Values) data?.Publish();
+            Tables = tables;
+            return tables;
+        }}
+
+        {table_base} LoadSection(string path, TableID id, {table_base} data)
+        {{
+            if (!Entries.TryGetValue(id, out var entry)) return null;
+            using (var stream = new FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read))
+            using (var reader = new BinaryReader(stream))
+            {{
+                // 文字列プールはスレッドごとに保持される
+                ClassDataStringPool.Current = Strings;
+                data.Decode(OpenSection(entry, reader));
+                return data;
+            }}
+        }}
+
+        // TableID -> テーブルの生成（文字列プール等、対応するテーブルが無いセクションはnull）
+        public static {table_base} CreateTable(TableID id)
+        {{
+            switch (id)
+            {{
+"""
+    for table_id, table_class in tables:
+        cs += f"                case {table_id}: return new {table_class}();\n"
+    cs += """                default: return null;
+            }
+        }
 
-    }
-}
+        // セクション先頭にシークしたReaderを返す（圧縮セクションは展開したメモリ上のReader）
 """
+    cs += f"        public BinaryReader OpenSection({entry_type} entry, BinaryReader reader)\n"
+    cs += """        {
+            reader.BaseStream.Seek(entry.Offset, SeekOrigin.Begin);
+"""
+    if compressed:
+        cs += """            if (entry.Codec == 0) return reader;
+            if (!Codecs.TryGetValue(entry.Codec, out var decode))
+                throw new NotSupportedException($"Unsupported section codec {entry.Codec}");
+            return new BinaryReader(new MemoryStream(decode(reader.ReadBytes(entry.Size), entry.RawSize)));
+        }
+
+        static byte[] InflateRaw(byte[] data, int rawSize)
+        {
+            var result = new byte[rawSize];
+            using (var stream = new DeflateStream(new MemoryStream(data), CompressionMode.Decompress))
+            {
+                int read = 0;
+                while (read < rawSize)
+                {
+                    int n = stream.Read(result, read, rawSize - read);
+                    if (n <= 0) break;
+                    read += n;
+                }
+            }
+            return result;
+        }
+"""
+    else:
+        cs += """            return reader;
+        }
+"""
+    cs += "    }\n}\n"
+    return cs
+
+@app.route('/api/generate-all-cs-header', methods=['POST'])
+@build_cached
+def generate_all_cs_header():
+    try:
+        cs_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'ClassDataHeader.cs')
+        list_path = os.path.join(DATA_DIR, CLASS_DATA_ID, 'class_data_id_list.json')
+        with open(list_path, 'r', encoding='utf-8') as f:
+            class_list = json.load(f)
+        
+        tables = [(f"TableID.{item['name']}", f"{item['name']}Table") for item in class_list]
+        cs_content = generate_cs_container_header('ClassDataHeader', 'BaseTable', get_build_settings(), tables)
         with open(cs_path, 'w', encoding='utf-8') as f:
             f.write(cs_content)
         return jsonify({"message": "C# header generated successfully"})
@@ -970,7 +2357,7 @@ def manage_state_data():
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning state-data: {data}")
+            logger.debug("Returning state-data: %s", PayloadSummary(data))
             return jsonify(data)
         except FileNotFoundError:
             return jsonify([]), 404
@@ -1031,7 +2418,7 @@ def manage_class_data_id():
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"ClassDataIDリストを返します: {data}")
+            logger.debug("ClassDataIDリストを返します: %s", PayloadSummary(data))
             return jsonify(data), 200
         except FileNotFoundError:
             logger.warning("class_data_id_list.jsonが見つかりません")
@@ -1145,7 +2532,7 @@ def class_data_id_detail(name):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning class-data-id detail: {name}")
+            logger.debug("Returning class-data-id detail: %s", name)
             return jsonify(data)
         except FileNotFoundError:
             logger.error(f"ClassDataID {name} not found")
@@ -1176,6 +2563,7 @@ def class_data_id_detail(name):
             return jsonify({"error": str(e)}), 500
 
 @app.route('/api/generate-class-data-id/<name>', methods=['POST'])
+@build_cached
 def generate_class_data_id_cs(name):
     try:
         data = request.get_json()
@@ -1183,6 +2571,11 @@ def generate_class_data_id_cs(name):
         rows = data['rows']
         basic_types, unity_types, enum_list, class_list, class_data_id_list = get_type_lists()
         enum_name = f"{name}TableID"  # Enum名をTableIDに変更
+        dense = is_contiguous_ids(rows)  # 連番IDなら配列でも保持する
+        settings = get_build_settings()
+        narrow = settings['narrow_columns']
+        widths = get_column_widths(columns, enum_list, class_data_id_list) if narrow else {}
+        bool_columns = [col for col in columns if narrow and col['type'].lower() == 'bool']
 
         # 出力ディレクトリ作成
         table_dir = os.path.join(DATA_DIR, CLASS_DATA_ID, f"{name}")
@@ -1210,10 +2603,19 @@ def generate_class_data_id_cs(name):
             # --- Read Method ---
             lf.write("\n            public override void Read(BinaryReader reader)\n")
             lf.write("            {\n")
+            # ビットパックされたboolを先に展開
+            for k in range((len(bool_columns) + 7) // 8):
+                lf.write(f"                byte flags{k} = reader.ReadByte();\n")
+            for k, col in enumerate(bool_columns):
+                lf.write(f"                {col['name']} = (flags{k >> 3} & {1 << (k & 7)}) != 0;\n")
             for i, col in enumerate(columns):
                 type_lower = col['type'].lower()
+                if col in bool_columns:
+                    continue
                 if type_lower in TYPE_MAP:
-                    if type_lower == 'string':
+                    if type_lower == 'string' and settings['string_pool']:
+                        lf.write(f"                {col['name']} = ClassDataStringPool.Get(reader.ReadInt32());\n")
+                    elif type_lower == 'string':
                         lf.write(f"                int len{i} = reader.ReadInt32();\n")
                         lf.write(f"                {col['name']} = System.Text.Encoding.UTF8.GetString(reader.ReadBytes(len{i}));\n")
                     elif type_lower == 'vector2':
@@ -1223,11 +2625,11 @@ def generate_class_data_id_cs(name):
                     else:
                         lf.write(f"                {col['name']} = reader.{TYPE_MAP[type_lower]['cs_read']}();\n")
                 elif col['type'] in enum_list:
-                    lf.write(f"                {col['name']} = (GameCore.Enums.{col['type']})Enum.ToObject(typeof(GameCore.Enums.{col['type']}), reader.ReadInt32());\n")
+                    lf.write(f"                {col['name']} = (GameCore.Enums.{col['type']})reader.{CS_READ_BY_PACK[widths.get(col['name'], 'i')]}();\n")
                 elif col['type'] in class_list:
                     lf.write(f"                {col['name']} = new GameCore.Classes.{col['type']}(reader);\n")
                 elif col['type'] in class_data_id_list:
-                    lf.write(f"                {col['name']} = (GameCore.Tables.ID.{col['type']}TableID)Enum.ToObject(typeof(GameCore.Tables.ID.{col['type']}TableID), reader.ReadInt32());\n")
+                    lf.write(f"                {col['name']} = (GameCore.Tables.ID.{col['type']}TableID)reader.{CS_READ_BY_PACK[widths.get(col['name'], 'i')]}();\n")
                 else:
                     lf.write(f"                {col['name']} = default; // Unsupported\n")
             lf.write("            }\n")
@@ -1241,27 +2643,65 @@ def generate_class_data_id_cs(name):
             f.write("namespace GameCore.Tables\n{\n")
             f.write(f"    public class {name}Table : BaseClassDataID<{enum_name}, {name}Row>\n    {{\n")
             #f.write(f"        public static Dictionary<{enum_name}, {name}Row> Table = new Dictionary<{enum_name}, {name}Row>();\n\n")
+            if dense:
+                f.write(f"        // IDが1からの連番のため (int)id をインデックスとする配列でも保持する\n")
+                f.write(f"        public static {name}Row[] Rows = new {name}Row[0];\n\n")
+            if settings['schema_fingerprint']:
+                f.write(f"        public const ulong SchemaHash = 0x{get_schema_hash(columns, widths if narrow else None):016X}UL;\n\n")
 
             # --- Table Constructor ---
-            f.write(f"        public override void Read(BinaryReader reader)\n        {{\n")
-            f.write(f"            {name}Table.Table.Clear();\n")
+            # Decodeは静的なTable/Rowsに触れず、Publishでまとめて差し替える
+            f.write(f"        Dictionary<{enum_name}, {name}Row> decodedTable;\n")
+            if dense:
+                f.write(f"        {name}Row[] decodedRows;\n")
+            f.write("\n        public override void Read(BinaryReader reader)\n        {\n")
+            f.write("            Decode(reader);\n")
+            f.write("            Publish();\n")
+            f.write("        }\n\n")
+            f.write(f"        public override void Decode(BinaryReader reader)\n        {{\n")
             f.write("            int rowCount = reader.ReadInt32();\n")
             f.write("            int colCount = reader.ReadInt32();\n")
-            f.write("            var colNames = new string[colCount];\n")
-            f.write("            var colTypes = new string[colCount];\n")
-            f.write("            for(int i=0; i<colCount; i++) {\n")
-            f.write("                int len = reader.ReadInt32();\n")
-            f.write("                colNames[i] = System.Text.Encoding.UTF8.GetString(reader.ReadBytes(len));\n")
-            f.write("                len = reader.ReadInt32();\n")
-            f.write("                colTypes[i] = System.Text.Encoding.UTF8.GetString(reader.ReadBytes(len));\n")
-            f.write("            }\n")
+            if settings['schema_fingerprint']:
+                f.write("            if (reader.ReadUInt64() != SchemaHash)\n")
+                f.write(f"                throw new InvalidDataException(\"{name}Table: schema hash mismatch (regenerate C# and binary)\");\n")
+            else:
+                f.write("            var colNames = new string[colCount];\n")
+                f.write("            var colTypes = new string[colCount];\n")
+                f.write("            for(int i=0; i<colCount; i++) {\n")
+                f.write("                int len = reader.ReadInt32();\n")
+                f.write("                colNames[i] = System.Text.Encoding.UTF8.GetString(reader.ReadBytes(len));\n")
+                f.write("                len = reader.ReadInt32();\n")
+                f.write("                colTypes[i] = System.Text.Encoding.UTF8.GetString(reader.ReadBytes(len));\n")
+                f.write("            }\n")
+            f.write(f"            var table = new Dictionary<{enum_name}, {name}Row>(rowCount);\n")
+            if dense:
+                f.write(f"            var rows = new {name}Row[Math.Max(rowCount + 1, (int){enum_name}.Max)];\n")
             f.write("            for(int r=0; r<rowCount; r++) {\n")
-            f.write(f"                var enumVal = ({enum_name})Enum.ToObject(typeof({enum_name}), reader.ReadInt32());\n")
+            f.write(f"                var enumVal = ({enum_name})reader.ReadInt32();\n")
             f.write(f"                var row = new {name}Row();\n")
             f.write("                row.Read(reader);\n")  # ← Readでまとめる
-            f.write("                Table[enumVal] = row;\n")
+            f.write("                table[enumVal] = row;\n")
+            if dense:
+                f.write("                if ((uint)enumVal < (uint)rows.Length) rows[(int)enumVal] = row;\n")
             f.write("            }\n")
+            f.write("            decodedTable = table;\n")
+            if dense:
+                f.write("            decodedRows = rows;\n")
+            f.write("        }\n\n")
+            f.write("        public override void Publish()\n        {\n")
+            f.write("            if (decodedTable == null) return;\n")
+            f.write("            Table = decodedTable;\n")
+            if dense:
+                f.write("            Rows = decodedRows;\n")
+            f.write("            decodedTable = null;\n")
+            if dense:
+                f.write("            decodedRows = null;\n")
             f.write("        }\n")
+            if dense:
+                f.write("\n        public override void Release()\n        {\n")
+                f.write("            base.Release();\n")
+                f.write(f"            Rows = new {name}Row[0];\n")
+                f.write("        }\n")
             f.write("    }\n}\n")
 
         # --- Enum File ---
@@ -1285,14 +2725,20 @@ def generate_class_data_id_cs(name):
             ef.write(f"    public static class {name}IDExtensions\n    {{\n")
             ef.write(f"        public static {name}Row GetRow(this {name}TableID id)\n")
             ef.write("        {\n")
-            ef.write(f"            if ({name}Table.Table.TryGetValue(id, out var row))\n")
-            ef.write("            {\n")
-            ef.write("                return row;\n")
-            ef.write("            }\n")
-            ef.write("            else\n")
-            ef.write("            {\n")
-            ef.write("                return null; // または throw new KeyNotFoundException()\n")
-            ef.write("            }\n")
+            if dense:
+                # 連番IDは配列を直接参照（ハッシュ計算なし）
+                ef.write(f"            var rows = {name}Table.Rows;\n")
+                ef.write("            int index = (int)id;\n")
+                ef.write("            return (uint)index < (uint)rows.Length ? rows[index] : null;\n")
+            else:
+                ef.write(f"            if ({name}Table.Table.TryGetValue(id, out var row))\n")
+                ef.write("            {\n")
+                ef.write("                return row;\n")
+                ef.write("            }\n")
+                ef.write("            else\n")
+                ef.write("            {\n")
+                ef.write("                return null; // または throw new KeyNotFoundException()\n")
+                ef.write("            }\n")
             ef.write("        }\n")
             ef.write("    }\n")
             ef.write("}\n")
@@ -1302,16 +2748,75 @@ def generate_class_data_id_cs(name):
         return jsonify({"error": str(e)}), 500
 
     
+# ClassData定義のコンパイル済みレイアウト {クラス名: (class_list, {クラス名: (mtime, サイズ)}, [(フィールド名, 型, arraySize, 子レイアウト), ...])}
+# 子クラスのレイアウトは展開済みで保持するため、子孫を含む全定義ファイルの stat と class_list が同じ場合のみ再利用する
+# （定義の保存・削除時は invalidate_class_layouts でも破棄する）
+_class_layout_cache = {}
+
+def get_class_file_stat(type_str):
+    try:
+        stat = os.stat(os.path.join(DATA_DIR, CLASS_DATA, type_str, f"{type_str}.class.json"))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def get_class_layout(type_str, class_list, resolving=None):
+    class_names = frozenset(class_list)
+    cached = _class_layout_cache.get(type_str)
+    if cached is not None and cached[0] == class_names and all(get_class_file_stat(name) == stat for name, stat in cached[1].items()):
+        return cached[2]
+    resolving = resolving if resolving is not None else set()
+    if type_str in resolving:
+        raise ValueError(f"Recursive class definition: {type_str}")
+    resolving.add(type_str)
+    class_path = os.path.join(DATA_DIR, CLASS_DATA, type_str, f"{type_str}.class.json")
+    # 読む前のstatを記録する（読んだ後に書き換えられた場合は次回読み直す）
+    stats = {type_str: get_class_file_stat(type_str)}
+    class_data = []
+    if os.path.exists(class_path):
+        with open(class_path, 'r', encoding='utf-8') as f:
+            class_data = json.load(f)
+    layout = []
+    for item in class_data:
+        child = None
+        if item['type'] in class_list:
+            child = get_class_layout(item['type'], class_list, resolving)
+            stats.update(_class_layout_cache[item['type']][1])
+        layout.append((item['name'], item['type'], item.get('arraySize', 0), child))
+    resolving.discard(type_str)
+    _class_layout_cache[type_str] = (class_names, stats, layout)
+    return layout
+
+def invalidate_class_layouts():
+    # 親クラスが子のレイアウトを内包しているため全て破棄
+    _class_layout_cache.clear()
+
+# レイアウトに沿ってClassDataの値を書き込む
+def write_class_fields(f, value, layout, enum_list, class_list, string_pool=None):
+    for field_name, field_type, array_size, child in layout:
+        item_value = value.get(field_name) if isinstance(value, dict) else None
+        if array_size == -1:  # List
+            values = item_value if isinstance(item_value, list) else []
+            f.write(struct.pack('i', len(values)))
+        elif array_size > 0:  # Array（Read側は固定長で読むため不足分はデフォルト値）
+            values = item_value if isinstance(item_value, list) else []
+            values = (values + [None] * array_size)[:array_size]
+        else:
+            values = [item_value]
+        for v in values:
+            if child is not None:
+                write_class_fields(f, v, child, enum_list, class_list, string_pool)
+            else:
+                write_binary_field(f, v, field_type, enum_list, class_list, string_pool)
+
 #バイナリ書き込み
-def write_binary_field(f, value, type_str, enum_list, class_list):
+def write_binary_field(f, value, type_str, enum_list, class_list, string_pool=None):
     type_lower = type_str.lower()
 
     if type_lower in TYPE_MAP:
         # 文字列処理
         if type_lower == 'string':
-            val_bytes = (value or '').encode('utf-8') if isinstance(value, str) else b''
-            f.write(struct.pack('i', len(val_bytes)))
-            f.write(val_bytes)
+            f.write(pack_string(value, string_pool))
 
         # ベクトル2
         elif type_lower == 'vector2':
@@ -1342,96 +2847,30 @@ def write_binary_field(f, value, type_str, enum_list, class_list):
         f.write(struct.pack('i', int(value) if value is not None else 0))
 
     elif type_str in class_list:
-        # ClassDataの再帰処理
-        class_data = json.load(open(os.path.join(DATA_DIR, CLASS_DATA, f"{type_str}.json"))) \
-            if os.path.exists(os.path.join(DATA_DIR, CLASS_DATA, f"{type_str}.json")) else []
-        for item in class_data:
-            array_size = item.get('arraySize', 0)
-            item_value = value.get(item['name']) if isinstance(value, dict) else None
-            if array_size == -1:  # List
-                values = item_value if isinstance(item_value, list) else []
-                f.write(struct.pack('i', len(values)))
-                for v in values:
-                    write_binary_field(f, v, item['type'], enum_list, class_list)
-            elif array_size > 0:  # Array
-                values = item_value if isinstance(item_value, list) else [None] * array_size
-                for v in values[:array_size]:
-                    write_binary_field(f, v, item['type'], enum_list, class_list)
-            else:
-                write_binary_field(f, item_value, item['type'], enum_list, class_list)
+        # ClassDataはコンパイル済みレイアウトで展開（セルごとのファイルI/Oなし）
+        write_class_fields(f, value, get_class_layout(type_str, class_list), enum_list, class_list, string_pool)
     else:
         f.write(struct.pack('i', 0))  # 未サポート型
 
 
 # ClassDataID Binary生成（行のレコード値を正確に書き込み）
 @app.route('/api/generate-binary/<name>', methods=['POST'])
+@build_cached
 def generate_binary(name):
     try:
-        data = request.get_json()
-        columns = data['columns']
-        rows = data['rows']
+        with metrics.phase('load_json'):
+            data = request.get_json()
         if  not os.path.exists(os.path.join(DATA_DIR, CLASS_DATA_ID, f"{name}",f"{name}Table.bin")):
             os.makedirs(os.path.join(DATA_DIR, CLASS_DATA_ID, f"{name}"), exist_ok=True)
         bin_path = os.path.join(DATA_DIR, CLASS_DATA_ID, name, f"{name}Table.bin")
-        basic_types, unity_types, enum_list, class_list, class_data_id_list = get_type_lists()
-        with open(bin_path, 'wb') as f:
-            # ヘッダ: 行数, カラム数
-            f.write(struct.pack('ii', len(rows), len(columns)))
-            # カラムメタ: 名前長, 名前, 型名長, 型名
-            #for col in columns:
-            #    name_bytes = col['name'].encode('utf-8')
-            #    type_bytes = col['type'].encode('utf-8')
-            #    f.write(struct.pack('i', len(name_bytes)))
-            #    f.write(name_bytes)
-            #    f.write(struct.pack('i', len(type_bytes)))
-            #    f.write(type_bytes)
-            # データ: 行ごとにEnumValue, 各カラム値
-            for row in rows:
-                f.write(struct.pack('i', row['id']))
-                for col in columns:
-                    col_type = col['type'].lower()
-                    col_value = row['data'].get(col['name'])
-                    if col_type in TYPE_MAP:
-                        actual_value = col_value.get('value') if isinstance(col_value, dict) else col_value
-                        if col_type == 'string':
-                            val_bytes = (actual_value or '').encode('utf-8') if isinstance(actual_value, str) else b''
-                            f.write(struct.pack('i', len(val_bytes)))
-                            f.write(val_bytes)
-                        elif col_type == 'vector2':
-                            x, y = actual_value if isinstance(actual_value, (list, tuple)) and len(actual_value) >= 2 else [0.0, 0.0]
-                            f.write(struct.pack('ff', float(x), float(y)))
-                        elif col_type == 'vector3':
-                            x, y, z = actual_value if isinstance(actual_value, (list, tuple)) and len(actual_value) >= 3 else [0.0, 0.0, 0.0]
-                            f.write(struct.pack('fff', float(x), float(y), float(z)))
-                        elif col_type == 'double':
-                            f.write(struct.pack('d', float(actual_value) if actual_value is not None else 0.0))
-                        elif col_type == 'bool':
-                            f.write(struct.pack('?', bool(actual_value) if actual_value is not None else False))
-                        else:
-                            default_value = 0 if col_type in ['int', 'float'] else False
-                            f.write(struct.pack(TYPE_MAP[col_type]['pack'], actual_value if actual_value is not None else default_value))
-
-                    elif col['type'] in enum_list:
-                        actual_value = col_value.get('value') if isinstance(col_value, dict) else col_value
-                        f.write(struct.pack('i', int(actual_value) if actual_value is not None else 0))
-                    elif col['type'] in class_list:
-                        class_data = json.load(open(os.path.join(DATA_DIR, CLASS_DATA, f"{col['type']}.json"))) if os.path.exists(os.path.join(DATA_DIR, CLASS_DATA, f"{col['type']}.json")) else []
-                        for item in class_data:
-                            item_value = col_value.get(item['name']) if isinstance(col_value, dict) else None
-                            array_size = item.get('arraySize', 0)
-                            if array_size == -1:  # List
-                                values = item_value if isinstance(item_value, list) else []
-                                f.write(struct.pack('i', len(values)))
-                                for v in values:
-                                    write_binary_field(f, v, item['type'], enum_list, class_list)
-                            elif array_size > 0:  # Array
-                                values = item_value if isinstance(item_value, list) else [None] * array_size
-                                for v in values[:array_size]:
-                                    write_binary_field(f, v, item['type'], enum_list, class_list)
-                            else:
-                                write_binary_field(f, item_value, item['type'], enum_list, class_list)
-                    else:
-                        f.write(struct.pack('i', 0))  # 未サポート型
+        string_pool = {} if get_build_settings()['string_pool'] else None
+        section = generate_binary_data(name, data, string_pool)
+        with metrics.phase('write'), open(bin_path, 'wb') as f:
+            # 文字列プール使用時は先頭にプール（ClassDataStringPool.Readで読んでからReadする）
+            if string_pool is not None:
+                f.write(encode_string_pool(string_pool))
+            # all_class_data.bin のセクションと同じレイアウト（生成された{name}Table.Readでそのまま読める）
+            f.write(section)
         return jsonify({"message": f"Binary generated: {bin_path}"})
     except Exception as e:
         logger.error(f"Error generating binary for {name}: {str(e)}")
@@ -1445,7 +2884,7 @@ def manage_state_detail(name):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            logger.debug(f"Returning state data for {name}: {data}")
+            logger.debug("Returning state data for %s: %s", name, PayloadSummary(data))
             return jsonify(data)
         except FileNotFoundError:
             return jsonify([]), 404
@@ -1484,12 +2923,18 @@ def manage_state_detail(name):
 @app.route('/api/generate-state/<name>', methods=['POST'])
 def generate_state_cs(name):
     try:
-        data = request.get_json()
-        generate_state_classes(os.path.join(DATA_DIR, STATE_DATA, name), name, data )
-        generate_state_id(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
-        generate_state_manager_data(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
-        generate_state_branch(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
-        generate_control_classes(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
+        with metrics.phase('load_json'):
+            data = request.get_json()
+        with metrics.phase('state_classes'):
+            generate_state_classes(os.path.join(DATA_DIR, STATE_DATA, name), name, data )
+        with metrics.phase('state_id'):
+            generate_state_id(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
+        with metrics.phase('manager_data'):
+            generate_state_manager_data(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
+        with metrics.phase('branch'):
+            generate_state_branch(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
+        with metrics.phase('control'):
+            generate_control_classes(os.path.join(DATA_DIR, STATE_DATA, name), name, data)
         logger.info(f"Generated {name}.cs")
         return jsonify({"message": f"{name}.cs generated successfully"})
     except Exception as e:
@@ -1918,6 +3363,13 @@ def generate_csharp_field(item, enum_list, class_list, unity_types, basic_types)
 
     return f"        public {type_str} {var_name} = {initial}; // {description}\n"   
 
+# C#側の文字列読み込み式（文字列プール使用時はインデックスから参照）
+# GameCore.Classes 側のコードからも使うため、プールは名前空間付きで参照する
+def get_cs_string_read():
+    if get_build_settings()['string_pool']:
+        return "GameCore.Tables.ClassDataStringPool.Get(reader.ReadInt32())"
+    return "System.Text.Encoding.UTF8.GetString(reader.ReadBytes(reader.ReadInt32()))"
+
 # C#フィールド生成（private + ゲッター）
 def generate_csharp_field(item, enum_list, class_list, unity_types, basic_types):
     type_str = item['type']
@@ -1964,18 +3416,20 @@ def generate_csharp_field(item, enum_list, class_list, unity_types, basic_types)
     # BinaryReader読み込みコード
     read_code = ""
     if is_list:
-        read_code = f"            {var_name} = new List<{item['type']}>();\n"
-        read_code += f"            int {var_name}_count = reader.ReadInt32();\n"
+        read_code = f"            int {var_name}_count = reader.ReadInt32();\n"
+        read_code += f"            {var_name} = new List<{item['type']}>({var_name}_count);\n"
         read_code += f"            for(int i=0; i<{var_name}_count; i++) {{\n"
         if item['type'].lower() in TYPE_MAP:
             if item['type'].lower() == 'vector2':
                 read_code += f"                {var_name}.Add(new Vector2(reader.ReadSingle(), reader.ReadSingle()));\n"
             elif item['type'].lower() == 'vector3':
                 read_code += f"                {var_name}.Add(new Vector3(reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle()));\n"
+            elif item['type'].lower() == 'string':
+                read_code += f"                {var_name}.Add({get_cs_string_read()});\n"
             else:
                 read_code += f"                {var_name}.Add(reader.{TYPE_MAP[item['type'].lower()]['cs_read']}());\n"
         elif item['type'] in enum_list:
-            read_code += f"                {var_name}.Add((GameCore.Enums.{item['type']})Enum.ToObject(typeof(GameCore.Enums.{item['type']}), reader.ReadInt32()));\n"
+            read_code += f"                {var_name}.Add((GameCore.Enums.{item['type']})reader.ReadInt32());\n"
         elif item['type'] in class_list:
             read_code += f"                {var_name}.Add(new GameCore.Classes.{item['type']}(reader));\n"
         else:
@@ -1989,10 +3443,12 @@ def generate_csharp_field(item, enum_list, class_list, unity_types, basic_types)
                 read_code += f"                {var_name}[i] = new Vector2(reader.ReadSingle(), reader.ReadSingle());\n"
             elif item['type'].lower() == 'vector3':
                 read_code += f"                {var_name}[i] = new Vector3(reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle());\n"
+            elif item['type'].lower() == 'string':
+                read_code += f"                {var_name}[i] = {get_cs_string_read()};\n"
             else:
                 read_code += f"                {var_name}[i] = reader.{TYPE_MAP[item['type'].lower()]['cs_read']}();\n"
         elif item['type'] in enum_list:
-            read_code += f"                {var_name}[i] = (GameCore.Enums.{item['type']})Enum.ToObject(typeof(GameCore.Enums.{item['type']}), reader.ReadInt32());\n"
+            read_code += f"                {var_name}[i] = (GameCore.Enums.{item['type']})reader.ReadInt32();\n"
         elif item['type'] in class_list:
             read_code += f"                {var_name}[i] = new GameCore.Classes.{item['type']}(reader);\n"
         else:
@@ -2004,10 +3460,12 @@ def generate_csharp_field(item, enum_list, class_list, unity_types, basic_types)
                 read_code = f"            {var_name} = new Vector2(reader.ReadSingle(), reader.ReadSingle());\n"
             elif type_str.lower() == 'vector3':
                 read_code = f"            {var_name} = new Vector3(reader.ReadSingle(), reader.ReadSingle(), reader.ReadSingle());\n"
+            elif type_str.lower() == 'string':
+                read_code = f"            {var_name} = {get_cs_string_read()};\n"
             else:
                 read_code = f"            {var_name} = reader.{TYPE_MAP[type_str.lower()]['cs_read']}();\n"
         elif type_str.startswith('GameCore.Enums.'):
-            read_code = f"            {var_name} = ({type_str})Enum.ToObject(typeof({type_str}), reader.ReadInt32());\n"
+            read_code = f"            {var_name} = ({type_str})reader.ReadInt32();\n"
         elif type_str.startswith('GameCore.Classes.'):
             read_code = f"            {var_name} = new {type_str}(reader);\n"
         else:
@@ -2266,6 +3724,7 @@ def handle_matrix_data(name):
         
 # C#生成
 @app.route('/api/generate-class-data-matrix-id/<name>', methods=['POST'])
+@build_cached
 def generate_cs_matrix(name):
     file_path = os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, name, f'{name}.json')
     try:
@@ -2290,15 +3749,132 @@ def generate_cs_matrix(name):
         # {name}MatrixID.cs
         matrix_cs = f"using System.IO;\nusing System;\nusing System.Collections.Generic;\n\n"
         matrix_cs += f"namespace GameCore.Tables {{\n    public class {name}MatrixID : BaseClassDataMatrixID<{row_id}ID, {col_id}ID, {name}MatrixRow> {{\n"
+        # Decodeは静的なTable等に触れず、Publishでまとめて差し替える
         matrix_cs += "        public override void Read(BinaryReader reader) {\n"
-        matrix_cs += f"            {name}MatrixID.Table.Clear();\n"
+        matrix_cs += "            Decode(reader);\n"
+        matrix_cs += "            Publish();\n"
+        matrix_cs += "        }\n\n"
+        matrix_cs += "        public override void Decode(BinaryReader reader) {\n"
         matrix_cs += f"            int rowCount = reader.ReadInt32();\n"
-        matrix_cs += f"            List<{row_id}ID> rowKeys = new List<{row_id}ID>(); for(int i=0; i<rowCount; i++) rowKeys.Add(({row_id}ID)reader.ReadInt32());\n"
+        matrix_cs += f"            var rowKeys = new {row_id}ID[rowCount]; for(int i=0; i<rowCount; i++) rowKeys[i] = ({row_id}ID)reader.ReadInt32();\n"
         matrix_cs += f"            int colCount = reader.ReadInt32();\n"
-        matrix_cs += f"            List<{col_id}ID> colKeys = new List<{col_id}ID>(); for(int i=0; i<colCount; i++) colKeys.Add(({col_id}ID)reader.ReadInt32());\n"
-        matrix_cs += f"            foreach(var rk in rowKeys) {{ Table[rk] = new Dictionary<{col_id}ID, {name}MatrixRow>(); }}\n"
-        matrix_cs += f"            foreach(var rk in rowKeys) {{ foreach(var ck in colKeys) {{ var row = new {name}MatrixRow(); row.Read(reader); Table[rk][ck] = row; }} }}\n"
-        matrix_cs += "        }\n    }\n}\n"
+        matrix_cs += f"            var colKeys = new {col_id}ID[colCount]; for(int i=0; i<colCount; i++) colKeys[i] = ({col_id}ID)reader.ReadInt32();\n"
+        storage = get_matrix_storage(json_data)
+        if storage == 'sparse':
+            # 既定値以外のセルのみTableに入れ、無いセルはDefaultRowを返す
+            matrix_cs += f"            var table = new Dictionary<{row_id}ID, Dictionary<{col_id}ID, {name}MatrixRow>>(rowCount);\n"
+            matrix_cs += f"            decodedTable = table;\n"
+            matrix_cs += f"            decodedDefaultRow = null;\n"
+            matrix_cs += f"            if (rowCount == 0 || colCount == 0) return;\n"
+            matrix_cs += f"            var defaultRow = new {name}MatrixRow(); defaultRow.Read(reader); decodedDefaultRow = defaultRow;\n"
+            matrix_cs += f"            int[] rowPtr = new int[rowCount + 1]; for(int i=0; i<=rowCount; i++) rowPtr[i] = reader.ReadInt32();\n"
+            matrix_cs += f"            for(int r=0; r<rowCount; r++) {{\n"
+            matrix_cs += f"                var cols = new Dictionary<{col_id}ID, {name}MatrixRow>(rowPtr[r + 1] - rowPtr[r]);\n"
+            matrix_cs += f"                for(int k=rowPtr[r]; k<rowPtr[r + 1]; k++) {{ var ck = colKeys[reader.ReadInt32()]; var row = new {name}MatrixRow(); row.Read(reader); cols[ck] = row; }}\n"
+            matrix_cs += f"                table[rowKeys[r]] = cols;\n"
+            matrix_cs += f"            }}\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += f"        Dictionary<{row_id}ID, Dictionary<{col_id}ID, {name}MatrixRow>> decodedTable;\n"
+            matrix_cs += f"        {name}MatrixRow decodedDefaultRow;\n\n"
+            matrix_cs += "        public override void Publish() {\n"
+            matrix_cs += "            if (decodedTable == null) return;\n"
+            matrix_cs += "            Table = decodedTable;\n"
+            matrix_cs += "            DefaultRow = decodedDefaultRow;\n"
+            matrix_cs += "            decodedTable = null;\n"
+            matrix_cs += "            decodedDefaultRow = null;\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += f"        public static {name}MatrixRow DefaultRow;\n\n"
+            matrix_cs += f"        public static {name}MatrixRow Get({row_id}ID rowKey, {col_id}ID colKey) {{\n"
+            matrix_cs += f"            return Table.TryGetValue(rowKey, out var cols) && cols.TryGetValue(colKey, out var row) ? row : DefaultRow;\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += "        public override void Release() {\n"
+            matrix_cs += "            base.Release();\n"
+            matrix_cs += "            DefaultRow = null;\n"
+            matrix_cs += "        }\n    }\n}\n"
+        elif storage == 'flat':
+            # 行優先の1次元配列。キーが連番ならインデックスは引き算のみ、そうでなければ読み込み時に値->位置の配列を作る
+            row_positions, col_positions = get_matrix_key_positions(json_data)
+            axes = [('Row', 'row', row_id, get_contiguous_start(row_positions)), ('Col', 'col', col_id, get_contiguous_start(col_positions))]
+            matrix_cs += f"            var cells = new {name}MatrixRow[rowCount * colCount];\n"
+            matrix_cs += f"            for(int i=0; i<cells.Length; i++) {{ var row = new {name}MatrixRow(); row.Read(reader); cells[i] = row; }}\n"
+            for axis, var, axis_id, start in axes:
+                if start is not None:
+                    matrix_cs += f"            for(int i=0; i<{var}Count; i++) if ((int){var}Keys[i] != {axis}Start + i) throw new InvalidDataException(\"{name}MatrixID: {var} keys are not contiguous (regenerate C# and binary)\");\n"
+                else:
+                    matrix_cs += f"            int {var}Max = 0; foreach(var key in {var}Keys) {var}Max = Math.Max({var}Max, (int)key);\n"
+                    matrix_cs += f"            var {var}Index = new int[{var}Max + 1]; for(int i=0; i<{var}Index.Length; i++) {var}Index[i] = -1;\n"
+                    matrix_cs += f"            for(int i=0; i<{var}Count; i++) if ({var}Index[(int){var}Keys[i]] < 0) {var}Index[(int){var}Keys[i]] = i;\n"
+                    matrix_cs += f"            decoded{axis}Index = {var}Index;\n"
+            matrix_cs += "            decodedRowCount = rowCount;\n"
+            matrix_cs += "            decodedColCount = colCount;\n"
+            matrix_cs += "            decodedCells = cells;\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += "        int decodedRowCount;\n"
+            matrix_cs += "        int decodedColCount;\n"
+            matrix_cs += f"        {name}MatrixRow[] decodedCells;\n"
+            for axis, var, axis_id, start in axes:
+                if start is None:
+                    matrix_cs += f"        int[] decoded{axis}Index;\n"
+            matrix_cs += "\n        public override void Publish() {\n"
+            matrix_cs += "            if (decodedCells == null) return;\n"
+            matrix_cs += "            Table.Clear();\n"
+            matrix_cs += "            RowCount = decodedRowCount;\n"
+            matrix_cs += "            ColCount = decodedColCount;\n"
+            matrix_cs += "            Cells = decodedCells;\n"
+            for axis, var, axis_id, start in axes:
+                if start is None:
+                    matrix_cs += f"            {axis}Index = decoded{axis}Index;\n"
+            matrix_cs += "            decodedCells = null;\n"
+            for axis, var, axis_id, start in axes:
+                if start is None:
+                    matrix_cs += f"            decoded{axis}Index = null;\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += "        public static int RowCount;\n"
+            matrix_cs += "        public static int ColCount;\n"
+            matrix_cs += f"        public static {name}MatrixRow[] Cells = new {name}MatrixRow[0];\n"
+            for axis, var, axis_id, start in axes:
+                if start is not None:
+                    matrix_cs += f"        public const int {axis}Start = {start};\n"
+                else:
+                    matrix_cs += f"        static int[] {axis}Index = new int[0];\n"
+            matrix_cs += "\n"
+            for axis, var, axis_id, start in axes:
+                matrix_cs += f"        public static int {axis}Of({axis_id}ID key) {{\n"
+                if start is not None:
+                    matrix_cs += f"            int index = (int)key - {axis}Start;\n"
+                    matrix_cs += f"            return (uint)index < (uint){axis}Count ? index : -1;\n"
+                else:
+                    matrix_cs += f"            int value = (int)key;\n"
+                    matrix_cs += f"            return (uint)value < (uint){axis}Index.Length ? {axis}Index[value] : -1;\n"
+                matrix_cs += "        }\n\n"
+            matrix_cs += f"        public static {name}MatrixRow Get({row_id}ID rowKey, {col_id}ID colKey) {{\n"
+            matrix_cs += "            int r = RowOf(rowKey);\n"
+            matrix_cs += "            int c = ColOf(colKey);\n"
+            matrix_cs += "            return r < 0 || c < 0 ? null : Cells[r * ColCount + c];\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += "        public override void Release() {\n"
+            matrix_cs += "            base.Release();\n"
+            matrix_cs += "            RowCount = 0;\n"
+            matrix_cs += "            ColCount = 0;\n"
+            matrix_cs += f"            Cells = new {name}MatrixRow[0];\n"
+            for axis, var, axis_id, start in axes:
+                if start is None:
+                    matrix_cs += f"            {axis}Index = new int[0];\n"
+            matrix_cs += "        }\n    }\n}\n"
+        else:
+            matrix_cs += f"            var table = new Dictionary<{row_id}ID, Dictionary<{col_id}ID, {name}MatrixRow>>(rowCount);\n"
+            matrix_cs += f"            foreach(var rk in rowKeys) {{ var cols = new Dictionary<{col_id}ID, {name}MatrixRow>(colCount); foreach(var ck in colKeys) {{ var row = new {name}MatrixRow(); row.Read(reader); cols[ck] = row; }} table[rk] = cols; }}\n"
+            matrix_cs += f"            decodedTable = table;\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += f"        Dictionary<{row_id}ID, Dictionary<{col_id}ID, {name}MatrixRow>> decodedTable;\n\n"
+            matrix_cs += "        public override void Publish() {\n"
+            matrix_cs += "            if (decodedTable == null) return;\n"
+            matrix_cs += "            Table = decodedTable;\n"
+            matrix_cs += "            decodedTable = null;\n"
+            matrix_cs += "        }\n\n"
+            matrix_cs += f"        public static {name}MatrixRow Get({row_id}ID rowKey, {col_id}ID colKey) {{\n"
+            matrix_cs += f"            return Table[rowKey][colKey];\n"
+            matrix_cs += "        }\n    }\n}\n"
         with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID,f"{name}", f"{name}MatrixID.cs"), 'w', encoding='utf-8') as f:
             f.write(matrix_cs)
         return jsonify({"message": f"C# generated for {name}"})
@@ -2307,146 +3883,620 @@ def generate_cs_matrix(name):
 
 # バイナリ生成
 @app.route('/api/generate-binary-matrix/<name>', methods=['POST'])
+@build_cached
 def generate_binary_matrix(name):
     file_path = os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, name, f'{name}.json')
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with metrics.phase('load_json'), open(file_path, 'r', encoding='utf-8') as f:
             json_data = json.load(f)
-        row_keys = list(json_data['data'].keys())
-        col_keys = list(json_data['data'][row_keys[0]].keys()) if row_keys else []
-        fields = json_data['fields']
-        enum_values = get_enum_values()
-
-        with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID,f"{name}", f"{name}.bin"), 'wb') as f:
-            f.write(struct.pack('i', len(row_keys)))
-            for rk in row_keys:
-                f.write(struct.pack('i', enum_values[json_data['rowId']].index(rk)))
-            f.write(struct.pack('i', len(col_keys)))
-            for ck in col_keys:
-                f.write(struct.pack('i', enum_values[json_data['colId']].index(ck)))
-            for rk in row_keys:
-                for ck in col_keys:
-                    cell = json_data['data'][rk][ck]
-                    for field in fields:
-                        value = cell[field['name']]
-                        t = field['type'].lower()
-                        if t in TYPE_MAP:
-                            if t == 'vector2':
-                                f.write(struct.pack('ff', *value))
-                            elif t == 'vector3':
-                                f.write(struct.pack('fff', *value))
-                            else:
-                                f.write(struct.pack(TYPE_MAP[t]['pack'], value))
-                        elif t in enum_values:
-                            f.write(struct.pack('i', enum_values[t].index(value.split('.')[-1])))
+        string_pool = {} if get_build_settings()['string_pool'] else None
+        section = generate_binary_matrix_data(name, json_data, string_pool)
+        with metrics.phase('write'), open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID,f"{name}", f"{name}.bin"), 'wb') as f:
+            # 文字列プール使用時は先頭にプール
+            if string_pool is not None:
+                f.write(encode_string_pool(string_pool))
+            f.write(section)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     return jsonify({"message": f"Binary generated for {name}"})
 
 
 
+# キー -> 先頭からの位置（list.indexの代わり。重複時は先頭を優先）
+def get_key_index(keys):
+    key_index = {}
+    for i, key in enumerate(keys):
+        key_index.setdefault(key, i)
+    return key_index
+
+# バイナリに書く行・列キーの値（キーの並びはJSONのdataの順）
+def get_matrix_key_positions(json_data, enum_values=None):
+    enum_values = enum_values if enum_values is not None else get_enum_values()
+    row_keys = list(json_data['data'].keys())
+    col_keys = list(json_data['data'][row_keys[0]].keys()) if row_keys else []
+    row_index = get_key_index(enum_values[json_data['rowId']])
+    col_index = get_key_index(enum_values[json_data['colId']])
+    return [row_index[rk] for rk in row_keys], [col_index[ck] for ck in col_keys]
+
+# キーの値が先頭から1ずつ増える連番なら先頭の値、そうでなければNone
+def get_contiguous_start(positions):
+    if positions and all(p == positions[0] + i for i, p in enumerate(positions)):
+        return positions[0]
+    return None
+
+# 全フィールドが固定長ならNumPyの構造化配列でセル部分を一括生成（該当しなければNoneでスカラー経路へ）
+def pack_matrix_cells_numpy(json_data, row_keys, col_keys, fields):
+    np = get_optional_module('numpy')
+    if np is None or not fields or any(field['type'].lower() not in NUMPY_MATRIX_DTYPES for field in fields):
+        return None
+    dtype = np.dtype([(f"f{i}", *NUMPY_MATRIX_DTYPES[field['type'].lower()]) for i, field in enumerate(fields)])
+    data = json_data['data']
+    cells = []
+    for rk in row_keys:
+        row = data[rk]
+        # 列の並びが同じ行はvalues()をそのまま使う
+        cells.extend(row.values() if list(row) == col_keys else [row[ck] for ck in col_keys])
+    packed = np.empty(len(cells), dtype=dtype)
+    # NumPyは 1.7 -> 1 や '3' -> 3.0 も変換してしまうため、struct.pack が受け付ける値だけをそのまま通す
+    # 受け付けない値（型・範囲・要素数の違い）があればスカラー版に任せて、同じ結果・同じエラーにする
+    try:
+        for i, field in enumerate(fields):
+            t = field['type'].lower()
+            base_dtype, shape = NUMPY_MATRIX_DTYPES[t]
+            # フィールドごとに1列分だけ取り出す（セルの辞書を引くのは列ごとに1回）
+            values = map(operator.itemgetter(field['name']), cells)
+            if t == 'bool':
+                # struct の '?' と同じく真偽値として評価される
+                packed[f"f{i}"] = np.fromiter(values, dtype=base_dtype, count=len(cells))
+                continue
+            if t == 'int':
+                # struct の 'i' と同じく __index__ で変換（float・文字列はTypeError、範囲外はOverflowError）
+                packed[f"f{i}"] = np.fromiter(map(operator.index, values), dtype=base_dtype, count=len(cells))
+                continue
+            values = list(values)
+            if shape:
+                # ベクトルは要素数を揃えてから平坦化する（struct.pack('ff', *value) も要素数が違えばエラー）
+                if set(map(len, values)) != {shape[0]}:
+                    return None
+                values = [component for value in values for component in value]
+            # 数値（int/float/bool）以外があれば sum がTypeErrorになる
+            sum(values, 0.0)
+            with np.errstate(all='ignore'):
+                column = np.array(values, dtype=base_dtype)
+            # float32に収まらない値は struct.pack では OverflowError（NaN/Infもスカラー版と同じバイト列にする）
+            if not np.isfinite(column).all():
+                return None
+            packed[f"f{i}"] = column.reshape(-1, *shape) if shape else column
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return packed.tobytes()
+
+# セル1つ分のペイロード
+def pack_matrix_cell(cell, fields, enum_values, string_pool=None):
+    payload = bytearray()
+    for field in fields:
+        value = cell[field['name']]
+        t = field['type'].lower()
+        if t in TYPE_MAP:
+            if t == 'vector2':
+                payload.extend(struct.pack('ff', *value))
+            elif t == 'vector3':
+                payload.extend(struct.pack('fff', *value))
+            elif t == 'string':
+                payload.extend(pack_string(value, string_pool))
+            else:
+                payload.extend(struct.pack(TYPE_MAP[t]['pack'], value))
+        elif t in enum_values:
+            payload.extend(struct.pack('i', enum_values[t].index(value.split('.')[-1])))
+    return bytes(payload)
+
+# 疎行列形式: 既定セル（最頻ペイロード）, rowPtr[rowCount+1], 各行の (列インデックス, ペイロード)
+def pack_matrix_sparse(json_data, row_keys, col_keys, enum_values, string_pool=None):
+    fields = json_data['fields']
+    data = json_data['data']
+    payloads = [[pack_matrix_cell(data[rk][ck], fields, enum_values, string_pool) for ck in col_keys] for rk in row_keys]
+    # セルが無い場合は既定セルも書かない（リーダー側も行数・列数が0なら読まない）
+    if not payloads or not col_keys:
+        return b''
+    counts = {}
+    for row in payloads:
+        for payload in row:
+            counts[payload] = counts.get(payload, 0) + 1
+    default = max(counts, key=counts.get)
+    row_ptr = [0]
+    entries = bytearray()
+    for row in payloads:
+        count = row_ptr[-1]
+        for col_index, payload in enumerate(row):
+            if payload != default:
+                entries.extend(struct.pack('i', col_index))
+                entries.extend(payload)
+                count += 1
+        row_ptr.append(count)
+    return default + struct.pack(f'{len(row_ptr)}i', *row_ptr) + bytes(entries)
+
 #バイナリデータ生成
-def generate_binary_matrix_data(name, json_data):
+def generate_binary_matrix_data(name, json_data, string_pool=None):
     binary_data = bytearray()
     row_keys = list(json_data['data'].keys())
     col_keys = list(json_data['data'][row_keys[0]].keys()) if row_keys else []
     fields = json_data['fields']
-    enum_values = get_enum_values()
+    with metrics.phase('resolve_enums'):
+        enum_values = get_enum_values()
+        row_positions, col_positions = get_matrix_key_positions(json_data, enum_values)
 
     binary_data.extend(struct.pack('i', len(row_keys)))
-    for rk in row_keys:
-        binary_data.extend(struct.pack('i', enum_values[json_data['rowId']].index(rk)))
+    binary_data.extend(struct.pack(f'{len(row_keys)}i', *row_positions))
     binary_data.extend(struct.pack('i', len(col_keys)))
-    for ck in col_keys:
-        binary_data.extend(struct.pack('i', enum_values[json_data['colId']].index(ck)))
-    for rk in row_keys:
-        for ck in col_keys:
-            cell = json_data['data'][rk][ck]
-            for field in fields:
-                value = cell[field['name']]
-                t = field['type'].lower()
-                if t in TYPE_MAP:
-                    if t == 'vector2':
-                        binary_data.extend(struct.pack('ff', *value))
-                    elif t == 'vector3':
-                        binary_data.extend(struct.pack('fff', *value))
-                    elif t == 'string':
-                        encoded = value.encode('utf-8')
-                        binary_data.extend(struct.pack('i', len(encoded)) + encoded)
-                    else:
-                        binary_data.extend(struct.pack(TYPE_MAP[t]['pack'], value))
-                elif t in enum_values:
-                    binary_data.extend(struct.pack('i', enum_values[t].index(value.split('.')[-1])))
+    binary_data.extend(struct.pack(f'{len(col_keys)}i', *col_positions))
+    if get_matrix_storage(json_data) == 'sparse':
+        with metrics.phase('pack_sparse'):
+            binary_data.extend(pack_matrix_sparse(json_data, row_keys, col_keys, enum_values, string_pool))
+        return binary_data
+    with metrics.phase('pack_numpy'):
+        cells = pack_matrix_cells_numpy(json_data, row_keys, col_keys, fields)
+    if cells is not None:
+        binary_data.extend(cells)
+        return binary_data
+    with metrics.phase('pack_scalar'):
+        for rk in row_keys:
+            for ck in col_keys:
+                binary_data.extend(pack_matrix_cell(json_data['data'][rk][ck], fields, enum_values, string_pool))
     return binary_data
 #Matrixを一つのバイナリファイルにまとめる
 @app.route('/api/generate-all-binary-matrix', methods=['POST'])
+@build_cached
 def generate_all_binary_matrix():
     try:
         all_binary_path = os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, 'all_class_data_matrix.bin')
-        header = bytearray()
-        data_sections = bytearray()
+        settings = get_build_settings()
+        string_pool = {} if settings['string_pool'] else None
+        entries = []
         
-        with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, 'class_data_matrix_id_list.json'), 'r', encoding='utf-8') as f:
+        with metrics.phase('load_json'), open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, 'class_data_matrix_id_list.json'), 'r', encoding='utf-8') as f:
             matrix_list = json.load(f)
         
-        header.extend(struct.pack('i', len(matrix_list)))
-        
-        offsets = {}
-        current_offset = 4 + sum(4 + 4 + len(item['name'].encode('utf-8')) + 8 + 4 for item in matrix_list)
-        
         for matrix in matrix_list:
             name = matrix['name']
             matrix_id = matrix.get('id', 0)  # IDが定義されていると仮定
-            name_encoded = name.encode('utf-8')
-            
-            header.extend(struct.pack('i', matrix_id))
-            header.extend(struct.pack('i', len(name_encoded)))
-            header.extend(name_encoded)
-            header.extend(struct.pack('q', 0))  # 仮オフセット
-            header.extend(struct.pack('i', 0))  # 仮サイズ
-            
+            section = b''
             file_path = os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, name, f'{name}.json')
             if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with metrics.phase('load_json'), open(file_path, 'r', encoding='utf-8') as f:
                     json_data = json.load(f)
-                section = generate_binary_matrix_data(name, json_data)
-                
-                offsets[name] = current_offset
-                current_offset += len(section)
-                data_sections.extend(section)
-        
-        with open(all_binary_path, 'wb') as f:
-            f.write(header)
-            f.write(data_sections)
+                section = generate_binary_matrix_data(name, json_data, string_pool)
+            entries.append((matrix_id, name, section))
+        if string_pool is not None:
+            entries.insert(0, (STRING_POOL_SECTION_ID, STRING_POOL_SECTION, encode_string_pool(string_pool)))
         
-        with open(all_binary_path, 'r+b') as f:
-            pos = 4
-            for matrix in matrix_list:
-                name = matrix['name']
-                name_len = len(name.encode('utf-8'))
-                pos += 4 + 4 + name_len
-                
-                f.seek(pos)
-                f.write(struct.pack('q', offsets.get(name, 0)))
-                
-                pos += 8
-                file_path = os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, name, f'{name}.json')
-                section_size = 0
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f2:
-                        json_data = json.load(f2)
-                    section_size = len(generate_binary_matrix_data(name, json_data))
-                f.write(struct.pack('i', section_size))
-                
-                pos += 4
+        with metrics.phase('write'), open(all_binary_path, 'wb') as f:
+            f.write(build_container(entries, settings['compression'], settings['patches']))
         
         logger.info("Generated all_class_data_matrix.bin")
         return jsonify({"message": "All matrix binary generated successfully"})
     except Exception as e:
         logger.error(f"Error generating all matrix binary: {str(e)}")
         return jsonify({"error": str(e)}), 500
+
+# Matrix単位のパッチ生成（all_class_data_matrix.bin のビルドに対する差し替え）
+@app.route('/api/generate-patch-matrix/<name>', methods=['POST'])
+def generate_patch_matrix(name):
+    try:
+        file_path = os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, name, f'{name}.json')
+        with open(file_path, 'r', encoding='utf-8') as f:
+            json_data = json.load(f)
+        version, patch_path = write_table_patch(CLASS_DATA_MATRIX_ID, 'all_class_data_matrix.bin', 'class_data_matrix_id_list.json', name,
+                                                lambda string_pool: generate_binary_matrix_data(name, json_data, string_pool))
+        logger.info(f"Generated patch {os.path.basename(patch_path)}")
+        return jsonify({"message": f"Patch generated for {name}", "version": version, "path": patch_path})
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        logger.error(f"Error generating matrix patch for {name}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+# バイナリ差分（2つのビルドのコンテナを比較）
+# セクションのハッシュを先に比較し、異なるセクションだけ現在のスキーマでデコードして行・セル単位の差分を出す
+# 文字列プールが変わった場合は文字列参照の位置だけを読んで解決後のハッシュを比較し、それでも異なるセクションだけデコードする
+class BinaryCursor:
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def read(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def read_bytes(self, size):
+        value = bytes(self.data[self.pos:self.pos + size])
+        self.pos += size
+        return value
+
+    def read_string(self, strings=None):
+        if strings is not None:
+            index, = self.read('i')
+            return strings[index] if 0 <= index < len(strings) else ''
+        size, = self.read('i')
+        return self.read_bytes(size).decode('utf-8')
+
+# 文字列プールセクションを文字列の一覧に戻す
+def decode_string_pool(section):
+    cursor = BinaryCursor(section)
+    count, = cursor.read('i')
+    return [cursor.read_string() for _ in range(count)]
+
+# write_binary_field / write_class_fields の逆
+def read_binary_field(cursor, type_str, enum_list, class_list, strings=None):
+    type_lower = type_str.lower()
+    if type_lower == 'string':
+        return cursor.read_string(strings)
+    if type_lower == 'vector2':
+        return list(cursor.read('ff'))
+    if type_lower == 'vector3':
+        return list(cursor.read('fff'))
+    if type_lower in TYPE_MAP:
+        return cursor.read(TYPE_MAP[type_lower]['pack'])[0]
+    if type_str in enum_list:
+        return cursor.read('i')[0]
+    if type_str in class_list:
+        return read_class_fields(cursor, get_class_layout(type_str, class_list), enum_list, class_list, strings)
+    return None
+
+def read_class_fields(cursor, layout, enum_list, class_list, strings=None):
+    value = {}
+    for field_name, field_type, array_size, child in layout:
+        count = cursor.read('i')[0] if array_size == -1 else max(array_size, 1)
+        items = [read_class_fields(cursor, child, enum_list, class_list, strings) if child is not None
+                 else read_binary_field(cursor, field_type, enum_list, class_list, strings) for _ in range(count)]
+        value[field_name] = items if array_size != 0 else items[0]
+    return value
+
+# ClassData-IDのセクションのヘッダー（行数・列数・スキーマ）を読み、現在のスキーマと一致するか確かめて行数を返す
+def read_binary_data_header(cursor, columns, settings, widths):
+    row_count, col_count = cursor.read('ii')
+    if col_count != len(columns):
+        raise ValueError("column count differs from the current schema")
+    if settings['schema_fingerprint']:
+        if cursor.read('Q')[0] != get_schema_hash(columns, widths if settings['narrow_columns'] else None):
+            raise ValueError("schema hash differs from the current schema")
+    else:
+        for col in columns:
+            if (cursor.read_string(), cursor.read_string()) != (col['name'], col['type']):
+                raise ValueError("columns differ from the current schema")
+    return row_count
+
+# ClassData-IDのセクションを {行ID: {カラム名: 値}} に戻す（generate_binary_data の逆）
+def decode_binary_data(section, columns, strings=None):
+    basic_types, unity_types, enum_list, class_list, class_data_id_list = get_type_lists()
+    settings = get_build_settings()
+    narrow = settings['narrow_columns']
+    widths = get_column_widths(columns, enum_list, class_data_id_list) if narrow else {}
+    bool_columns = [col for col in columns if narrow and col['type'].lower() == 'bool']
+    cursor = BinaryCursor(section)
+    row_count = read_binary_data_header(cursor, columns, settings, widths)
+    # enum/ClassDataID参照は数値を名前に戻して表示する
+    names = {}
+    for col in columns:
+        if col['type'] in enum_list:
+            names[col['name']] = {int(entry['value']): f"{col['type']}.{entry['property']}" for entry in get_json_enum(col['type'])}
+        elif col['type'] in class_data_id_list:
+            data_id = get_json_data_id(col['type'])
+            names[col['name']] = {int(entry['id']): f"{col['type']}.{entry['enum_property']}" for entry in (data_id.get('rows', []) if data_id else [])}
+    rows = {}
+    for _ in range(row_count):
+        row_id, = cursor.read('i')
+        cells = {}
+        if bool_columns:
+            flags = cursor.read_bytes((len(bool_columns) + 7) // 8)
+            for k, col in enumerate(bool_columns):
+                cells[col['name']] = bool(flags[k >> 3] & (1 << (k & 7)))
+        for col in columns:
+            if col in bool_columns:
+                continue
+            if col['type'].lower() in TYPE_MAP:
+                cells[col['name']] = read_binary_field(cursor, col['type'], enum_list, class_list, strings)
+            elif col['name'] in names:
+                value, = cursor.read(widths.get(col['name'], 'i'))
+                cells[col['name']] = names[col['name']].get(value, value)
+            elif col['type'] in class_list:
+                cells[col['name']] = read_class_fields(cursor, get_class_layout(col['type'], class_list), enum_list, class_list, strings)
+        rows[row_id] = cells
+    return rows
+
+# Matrixのセクションを {(行キー, 列キー): {フィールド名: 値}} に戻す（generate_binary_matrix_data の逆）
+def decode_binary_matrix_data(section, json_data, strings=None):
+    enum_values = get_enum_values()
+    fields = json_data['fields']
+    cursor = BinaryCursor(section)
+
+    def key_names(enum_name):
+        count, = cursor.read('i')
+        keys = enum_values.get(enum_name, [])
+        return [keys[p] if 0 <= p < len(keys) and isinstance(keys[p], str) else p for p in cursor.read(f'{count}i')]
+
+    def read_cell():
+        cell = {}
+        for field in fields:
+            t = field['type'].lower()
+            if t in TYPE_MAP:
+                cell[field['name']] = read_binary_field(cursor, t, [], [], strings)
+            elif t in enum_values:
+                index, = cursor.read('i')
+                keys = enum_values[t]
+                cell[field['name']] = keys[index] if 0 <= index < len(keys) and isinstance(keys[index], str) else index
+        return cell
+
+    row_keys = key_names(json_data['rowId'])
+    col_keys = key_names(json_data['colId'])
+    cells = {}
+    if get_matrix_storage(json_data) == 'sparse':
+        if row_keys and col_keys:
+            default = read_cell()
+            row_ptr = cursor.read(f'{len(row_keys) + 1}i')
+            for r, rk in enumerate(row_keys):
+                for ck in col_keys:
+                    cells[(rk, ck)] = default
+                for _ in range(row_ptr[r], row_ptr[r + 1]):
+                    col_index, = cursor.read('i')
+                    cells[(rk, col_keys[col_index])] = read_cell()
+    else:
+        for rk in row_keys:
+            for ck in col_keys:
+                cells[(rk, ck)] = read_cell()
+    return cells
+
+# 文字列プールを使ったセクションで、文字列以外のフィールドが占めるバイト数（文字列はプールのインデックス）
+POOLED_FIELD_SIZES = {'string': 4, 'vector2': 8, 'vector3': 12}
+
+def pooled_field_size(type_lower):
+    return POOLED_FIELD_SIZES.get(type_lower) or struct.calcsize(TYPE_MAP[type_lower]['pack'])
+
+# 文字列プールの参照位置だけを集める（値はデコードせず、固定長の部分は読み飛ばす）
+def scan_class_string_refs(cursor, layout, enum_list, class_list, refs):
+    for field_name, field_type, array_size, child in layout:
+        count = cursor.read('i')[0] if array_size == -1 else max(array_size, 1)
+        for _ in range(count):
+            if child is not None:
+                scan_class_string_refs(cursor, child, enum_list, class_list, refs)
+            elif field_type.lower() == 'string':
+                refs.append(cursor.pos)
+                cursor.pos += 4
+            elif field_type.lower() in TYPE_MAP:
+                cursor.pos += pooled_field_size(field_type.lower())
+            elif field_type in enum_list:
+                cursor.pos += 4
+
+# ClassData-IDのセクション内の文字列参照の位置（decode_binary_data と同じ並びを読み飛ばす）
+def scan_binary_data_string_refs(section, columns):
+    basic_types, unity_types, enum_list, class_list, class_data_id_list = get_type_lists()
+    settings = get_build_settings()
+    narrow = settings['narrow_columns']
+    widths = get_column_widths(columns, enum_list, class_data_id_list) if narrow else {}
+    bool_count = sum(1 for col in columns if narrow and col['type'].lower() == 'bool')
+    cursor = BinaryCursor(section)
+    row_count = read_binary_data_header(cursor, columns, settings, widths)
+    # 1行分の並び: 読み飛ばすバイト数、文字列参照（None）、クラスのレイアウト
+    plan = [4 + (bool_count + 7) // 8]
+    for col in columns:
+        t = col['type'].lower()
+        if narrow and t == 'bool':
+            continue
+        if t == 'string':
+            plan.append(None)
+        elif t in TYPE_MAP:
+            plan.append(pooled_field_size(t))
+        elif col['type'] in enum_list or col['type'] in class_data_id_list:
+            plan.append(struct.calcsize(widths.get(col['name'], 'i')))
+        elif col['type'] in class_list:
+            plan.append(get_class_layout(col['type'], class_list))
+    refs = []
+    for _ in range(row_count):
+        for step in plan:
+            if step is None:
+                refs.append(cursor.pos)
+                cursor.pos += 4
+            elif isinstance(step, int):
+                cursor.pos += step
+            else:
+                scan_class_string_refs(cursor, step, enum_list, class_list, refs)
+    if cursor.pos != len(section):
+        raise ValueError("section size differs from the current schema")
+    return refs
+
+# Matrixのセクション内の文字列参照の位置（セルは固定長なので位置を計算するだけ）
+def scan_binary_matrix_string_refs(section, json_data):
+    enum_values = get_enum_values()
+    cell_size = 0
+    string_offsets = []
+    for field in json_data['fields']:
+        t = field['type'].lower()
+        if t == 'string':
+            string_offsets.append(cell_size)
+        if t in TYPE_MAP:
+            cell_size += pooled_field_size(t)
+        elif t in enum_values:
+            cell_size += 4
+    pos = 0
+    counts = []
+    for _ in range(2):
+        count, = struct.unpack_from('i', section, pos)
+        counts.append(count)
+        pos += 4 + 4 * count
+    row_count, col_count = counts
+    if get_matrix_storage(json_data) == 'sparse':
+        if not row_count or not col_count:
+            cells = []
+        else:
+            # 既定セル, rowPtr[rowCount+1], (列インデックス, セル)...
+            row_ptr = struct.unpack_from(f'{row_count + 1}i', section, pos + cell_size)
+            entries_pos = pos + cell_size + 4 * (row_count + 1)
+            cells = [pos] + [entries_pos + e * (4 + cell_size) + 4 for e in range(row_ptr[-1])]
+            pos = entries_pos + row_ptr[-1] * (4 + cell_size)
+    else:
+        cells = range(pos, pos + row_count * col_count * cell_size, cell_size) if cell_size else []
+        pos += row_count * col_count * cell_size
+    if pos != len(section):
+        raise ValueError("section size differs from the current schema")
+    return [cell + offset for cell in cells for offset in string_offsets]
+
+# キー付きレコードの差分: (追加キー, 削除キー, [(キー, {名前: {'base', 'target'}})])
+def diff_records(base, target):
+    added = [key for key in target if key not in base]
+    removed = [key for key in base if key not in target]
+    changed = []
+    for key, record in target.items():
+        if key in base and base[key] != record:
+            names = list(base[key]) + [name for name in record if name not in base[key]]
+            changed.append((key, {name: {'base': base[key].get(name), 'target': record.get(name)}
+                                  for name in names if base[key].get(name) != record.get(name)}))
+    return added, removed, changed
+
+# 2つのコンテナの差分（kind: CLASS_DATA_ID / CLASS_DATA_MATRIX_ID）
+def diff_containers(base_data, target_data, kind=CLASS_DATA_ID):
+    base_entries = {e['id']: e for e in parse_container(base_data)}
+    target_entries = {e['id']: e for e in parse_container(target_data)}
+
+    def section_hash(data, entry):
+        return hashlib.blake2b(bytes(data[entry['offset']:entry['offset'] + entry['size']]), digest_size=16).digest() if entry else None
+
+    def pool(data, entries):
+        entry = entries.get(STRING_POOL_SECTION_ID)
+        return decode_string_pool(read_container_section(data, entry)) if entry else None
+
+    # プールのインデックスを参照先の文字列に置き換えたセクションのハッシュ（プール無しで書いた場合と同じバイト列）
+    def resolved_hash(section, offsets, strings):
+        if strings is None:
+            return hashlib.blake2b(section, digest_size=16).digest()
+        hasher = hashlib.blake2b(digest_size=16)
+        pos = 0
+        for offset in offsets:
+            index, = struct.unpack_from('i', section, offset)
+            hasher.update(section[pos:offset])
+            hasher.update(pack_string(strings[index] if 0 <= index < len(strings) else ''))
+            pos = offset + 4
+        hasher.update(section[pos:])
+        return hasher.digest()
+
+    # 文字列プールが変わると同じバイト列でも文字列が変わるため、その場合はインデックスを解決してから比較する
+    pool_changed = section_hash(base_data, base_entries.get(STRING_POOL_SECTION_ID)) != section_hash(target_data, target_entries.get(STRING_POOL_SECTION_ID))
+    base_strings = pool(base_data, base_entries)
+    target_strings = pool(target_data, target_entries)
+    # 片方のプールがもう片方の先頭部分（追記のみ）なら、同じバイト列のセクションは同じ文字列を指す
+    if pool_changed and base_strings is not None and target_strings is not None:
+        shared = min(len(base_strings), len(target_strings))
+        pool_changed = base_strings[:shared] != target_strings[:shared]
+    build_hash = {}
+    for label, data in (('base', base_data), ('target', target_data)):
+        value = get_container_build_hash(data)
+        build_hash[label] = f"{value:016x}" if value is not None else None
+
+    # セクションの読み取りは現在の {name}.json と現在のビルド設定で行う（どちらのビルド時の設定でもない）
+    settings = get_build_settings()
+    schema_fingerprint = settings['schema_fingerprint']
+    tables = []
+    for table_id in list(base_entries) + [i for i in target_entries if i not in base_entries]:
+        if table_id in (STRING_POOL_SECTION_ID, BUILD_HASH_SECTION_ID):
+            continue
+        base_entry, target_entry = base_entries.get(table_id), target_entries.get(table_id)
+        name = (target_entry or base_entry)['name']
+        result = {'id': table_id, 'name': name}
+        tables.append(result)
+        if base_entry is None or target_entry is None:
+            result['status'] = 'added' if base_entry is None else 'removed'
+            continue
+        if not pool_changed and section_hash(base_data, base_entry) == section_hash(target_data, target_entry):
+            result['status'] = 'unchanged'
+            continue
+        base_section = read_container_section(base_data, base_entry)
+        target_section = read_container_section(target_data, target_entry)
+        if not pool_changed and base_section == target_section:
+            result['status'] = 'unchanged'
+            continue
+        # ヘッダーにスキーマハッシュがあれば現在のスキーマと照合済み、無ければ現在のスキーマで読めたというだけ
+        result['schema_verified'] = kind == CLASS_DATA_ID and schema_fingerprint
+        try:
+            with open(os.path.join(DATA_DIR, kind, name, f'{name}.json'), 'r', encoding='utf-8') as f:
+                json_data = json.load(f)
+            if kind == CLASS_DATA_MATRIX_ID:
+                scan = lambda section: scan_binary_matrix_string_refs(section, json_data)
+                decode = lambda section, strings: decode_binary_matrix_data(section, json_data, strings)
+            else:
+                columns = json_data.get('columns', [])
+                scan = lambda section: scan_binary_data_string_refs(section, columns)
+                decode = lambda section, strings: decode_binary_data(section, columns, strings)
+            # 文字列の参照位置だけを読み、解決後のハッシュが同じならデコードしない
+            if pool_changed and (resolved_hash(base_section, scan(base_section) if base_strings is not None else [], base_strings)
+                                 == resolved_hash(target_section, scan(target_section) if target_strings is not None else [], target_strings)):
+                result['status'] = 'unchanged'
+                continue
+            base_records = decode(base_section, base_strings)
+            target_records = decode(target_section, target_strings)
+        except Exception as e:
+            # 現在のスキーマで読めない場合はセクション単位の変更のみ報告
+            result['status'] = 'changed'
+            result['detail'] = str(e)
+            continue
+        added, removed, changed = diff_records(base_records, target_records)
+        result['status'] = 'changed' if added or removed or changed else 'unchanged'
+        if result['status'] == 'unchanged':
+            continue
+        if kind == CLASS_DATA_MATRIX_ID:
+            result['cells'] = {
+                'added': [{'row': rk, 'col': ck} for rk, ck in added],
+                'removed': [{'row': rk, 'col': ck} for rk, ck in removed],
+                'changed': [{'row': rk, 'col': ck, 'fields': fields} for (rk, ck), fields in changed],
+            }
+        else:
+            result['rows'] = {
+                'added': added,
+                'removed': removed,
+                'changed': [{'id': row_id, 'cells': cells} for row_id, cells in changed],
+            }
+    return {
+        'build_hash': build_hash,
+        'decoded_with': {
+            'schema': 'current',
+            'build_settings': settings,
+            'note': "Changed sections are read with the current {name}.json schema and build settings, not the ones either build was made with. "
+                    "Tables with schema_verified false were not checked against an embedded schema hash.",
+        },
+        'tables': tables,
+    }
+
+# 差分対象のコンテナを読む（アップロードされたファイル、またはDATA_DIRからの相対パス）
+def read_diff_input(key, params):
+    if key in request.files:
+        return request.files[key].read()
+    path = params.get(key)
+    if not path:
+        raise ValueError(f"'{key}' is required")
+    full_path = os.path.realpath(os.path.join(DATA_DIR, path))
+    if os.path.commonpath([full_path, os.path.realpath(DATA_DIR)]) != os.path.realpath(DATA_DIR):
+        raise ValueError(f"'{key}' must be inside the data directory")
+    with open(full_path, 'rb') as f:
+        return f.read()
+
+@app.route('/api/diff-binary', methods=['POST'])
+def diff_binary():
+    try:
+        params = request.form if request.files else (request.get_json(silent=True) or {})
+        kind = params.get('kind', CLASS_DATA_ID)
+        if kind not in (CLASS_DATA_ID, CLASS_DATA_MATRIX_ID):
+            return jsonify({"error": f"Unknown kind: {kind}"}), 400
+        base_data = read_diff_input('base', params)
+        target_data = read_diff_input('target', params)
+        return jsonify(diff_containers(base_data, target_data, kind))
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except (ValueError, struct.error) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error diffing binaries: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 #Matrixのヘルパークラス生成
 @app.route('/api/generate-all-cs-matrix-header', methods=['POST'])
+@build_cached
 def generate_all_cs_matrix_header():
     try:
         # ClassDataMatrixHeader.cs
@@ -2455,44 +4505,8 @@ def generate_all_cs_matrix_header():
         with open(list_path, 'r', encoding='utf-8') as f:
             matrix_list = json.load(f)
         
-        cs_content = """
-using System;
-using System.IO;
-using System.Collections.Generic;
-using GameCore.Enums;
-
-namespace GameCore.Tables
-{
-    public class ClassDataMatrixHeader
-    {
-        public Dictionary<TableID, (string Name, long Offset, int Size)> Entries = new Dictionary<TableID, (string, long, int)>();
-
-        public ClassDataMatrixHeader(BinaryReader reader)
-        {
-            int count = reader.ReadInt32();
-            for(int i = 0; i < count; i++)
-            {
-                int id = reader.ReadInt32();
-                TableID tableId = (TableID)Enum.ToObject(typeof(TableID), id);
-                int nameLen = reader.ReadInt32();
-                string name = new string(reader.ReadChars(nameLen));
-                long offset = reader.ReadInt64();
-                int size = reader.ReadInt32();
-                Entries[tableId] = (name, offset, size);
-            }
-        }
-
-        public TTable GetData<TTable>(TableID id, BinaryReader reader) where TTable : BaseTableMatrix, new()
-        {
-            if (!Entries.TryGetValue(id, out var entry)) return null;
-            reader.BaseStream.Seek(entry.Offset, SeekOrigin.Begin);
-            TTable data = new TTable();
-            data.Read(reader);
-            return data;
-        }
-    }
-}
-"""
+        tables = [(f"(TableID)MatrixTableID.{item['name']}", f"{item['name']}MatrixID") for item in matrix_list]
+        cs_content = generate_cs_container_header('ClassDataMatrixHeader', 'BaseTableMatrix', get_build_settings(), tables)
         with open(cs_path, 'w', encoding='utf-8') as f:
             f.write(cs_content)
         
@@ -2502,6 +4516,7 @@ namespace GameCore.Tables
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/generate-matrix-table-id', methods=['POST'])
+@build_cached
 def generate_matrix_table_id():
     try:
         with open(os.path.join(DATA_DIR, CLASS_DATA_MATRIX_ID, 'class_data_matrix_id_list.json'), 'r', encoding='utf-8') as f:
@@ -2515,15 +4530,275 @@ def generate_matrix_table_id():
         return jsonify({"message": "MatrixTableID generated"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-        
+
+# メトリクス（Prometheus テキスト形式。?format=json でUI向けのJSON）
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.to_json())
+    return app.response_class(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# 保存済みプロファイルの一覧（新しい順）
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    profile_dir = get_profile_dir()
+    if not os.path.isdir(profile_dir):
+        return jsonify([])
+    profiles = []
+    for file in os.listdir(profile_dir):
+        if file.endswith(PROFILE_EXTENSIONS):
+            stat = os.stat(os.path.join(profile_dir, file))
+            profiles.append({'name': file, 'size': stat.st_size, 'created': http_date(stat.st_mtime)})
+    profiles.sort(key=lambda p: p['name'], reverse=True)
+    return jsonify(profiles)
+
+# プロファイルのダウンロード
+@app.route('/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    if not name.endswith(PROFILE_EXTENSIONS):
+        return jsonify({"error": f"{name} is not a profile"}), 404
+    return send_from_directory(get_profile_dir(), name, as_attachment=True)
+
 # 静的ファイルのルーティング
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_static(path):
-    logger.debug(f"Serving static file: {path}")
+    logger.debug("Serving static file: %s", path)
     if path != '' and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
-    return send_from_directory(app.static_folder, 'index.html')
+        return send_static_asset(path)
+    return send_static_asset('index.html')
+
+# 本番向けのマルチスレッド配信（waitressがあれば使い、無ければwerkzeugのスレッドサーバー）
+def serve_threaded(host, port, threads):
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+        logger.info(f"Serving on http://{host}:{port} (werkzeug, threaded)")
+        run_simple(host, port, app, threaded=True)
+        return
+    logger.info(f"Serving on http://{host}:{port} (waitress, {threads} threads)")
+    serve(app, host=host, port=port, threads=threads)
+
+# DATA_DIR の監視: git pull やスクリプトでUI外から変更されたJSONを検知し、メモリ上のキャッシュを破棄する
+# regenerate モードでは変更されたデータに依存する生成処理（.cs / .bin / コンテナ）だけを実行し直す
+# watchdog があれば変更通知ですぐに走査し、無ければ一定間隔のポーリングのみ
+WATCH_MODES = ('off', 'invalidate', 'regenerate')
+WATCH_INTERVAL = 1.0
+
+# 監視対象のJSONの (mtime, サイズ)
+def snapshot_inputs():
+    inputs = {}
+    for root, dirs, files in os.walk(DATA_DIR):
+        dirs[:] = [d for d in dirs if d != PATCH_DIR]
+        for file in files:
+            if file.endswith('.json'):
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # 走査中に削除された
+                inputs[path] = (stat.st_mtime_ns, stat.st_size)
+    return inputs
+
+def invalidate_input_caches(path):
+    _document_cache.pop(path, None)
+    _input_digest_cache.pop(path, None)
+    if os.path.relpath(path, DATA_DIR).split(os.sep)[0] == CLASS_DATA:
+        invalidate_class_layouts()
+
+def read_json_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# 一覧に登録されているドキュメント [(名前, パス, 内容)]（ファイルが無いものは除く）
+def get_listed_documents(kind, list_file, file_template):
+    list_path = os.path.join(DATA_DIR, kind, list_file)
+    documents = []
+    for item in read_json_file(list_path) if os.path.exists(list_path) else []:
+        path = os.path.join(DATA_DIR, kind, item['name'], file_template.format(name=item['name']))
+        if os.path.exists(path):
+            documents.append((item['name'], path, read_json_file(path)))
+    return documents
+
+def get_tables():
+    return get_listed_documents(CLASS_DATA_ID, 'class_data_id_list.json', '{name}.json')
+
+def get_matrices():
+    return get_listed_documents(CLASS_DATA_MATRIX_ID, 'class_data_matrix_id_list.json', '{name}.json')
+
+# テーブルの .cs と .bin（どちらもテーブルのJSONを本文に渡す）
+def get_table_targets(name, path):
+    return [(f'/api/generate-class-data-id/{name}', path), (f'/api/generate-binary/{name}', path)]
+
+# Matrixの .cs と .bin（どちらもファイルから読む）
+def get_matrix_targets(name):
+    return [(f'/api/generate-class-data-matrix-id/{name}', None), (f'/api/generate-binary-matrix/{name}', None)]
+
+# 変更されたJSON（DATA_DIRからの相対パス）-> 実行し直す生成エンドポイント [(パス, 本文のJSONファイル or None)]
+# 個別の生成を先に、コンテナ（all_*.bin）・ヘッダーなど全体の生成を後に並べる
+def get_regeneration_targets(rel_path):
+    parts = rel_path.replace(os.sep, '/').split('/')
+    containers = [('/api/generate-all-binary', None), ('/api/generate-all-binary-matrix', None)]
+    if parts == [BUILD_SETTINGS_FILE]:
+        # スキーマハッシュ・文字列プール・カラム幅・Matrixの格納方式は個別の .cs / .bin にも反映される
+        targets = [(f'/api/generate-class/{name}', path) for name, path, _ in get_listed_documents(CLASS_DATA, 'class_list.json', '{name}.class.json')]
+        for name, path, _ in get_tables():
+            targets += get_table_targets(name, path)
+        for name, _, _ in get_matrices():
+            targets += get_matrix_targets(name)
+        return targets + containers + [('/api/generate-all-cs-header', None), ('/api/generate-all-cs-matrix-header', None)]
+    if len(parts) == 2:
+        return {
+            (ENUM, 'enum_list.json'): [('/api/generate-all-enums', None)],
+            (CLASS_DATA_ID, 'class_data_id_list.json'): [('/api/generate-table-id', None), ('/api/generate-all-cs-header', None), ('/api/generate-all-binary', None)],
+            (CLASS_DATA_MATRIX_ID, 'class_data_matrix_id_list.json'): [('/api/generate-matrix-table-id', None), ('/api/generate-all-cs-matrix-header', None), ('/api/generate-all-binary-matrix', None)],
+        }.get(tuple(parts), [])
+    if len(parts) != 3:
+        return []
+    kind, name, file = parts
+    path = os.path.join(DATA_DIR, *parts)
+    if kind == ENUM and file == f"{name}.json":
+        # Enumの値はテーブル・Matrixのバイナリに書かれ、narrow_columns ではテーブルの読み込み幅も変わる
+        targets = [(f'/api/generate-enum/{name}', path)]
+        for table, table_path, table_data in get_tables():
+            if any(col.get('type') == name for col in table_data.get('columns', [])):
+                targets += get_table_targets(table, table_path)
+        for matrix, _, matrix_data in get_matrices():
+            if any(field.get('type') == name for field in matrix_data.get('fields', [])):
+                targets.append((f'/api/generate-binary-matrix/{matrix}', None))
+        return targets + containers
+    if kind == CLASS_DATA and file == f"{name}.class.json":
+        # クラスの値はレイアウトに沿ってテーブルのバイナリに書かれる（このクラスを入れ子で持つクラスのカラムも含む）
+        classes = get_listed_documents(CLASS_DATA, 'class_list.json', '{name}.class.json')
+        users = {name}
+        while True:
+            found = {cls for cls, _, fields in classes if cls not in users and any(field.get('type') in users for field in fields)}
+            if not found:
+                break
+            users |= found
+        targets = [(f'/api/generate-class/{name}', path)]
+        for table, table_path, table_data in get_tables():
+            if any(col.get('type') in users for col in table_data.get('columns', [])):
+                targets += get_table_targets(table, table_path)
+        return targets + [('/api/generate-all-binary', None)]
+    if kind == CLASS_DATA_ID and file == f"{name}.json":
+        # このテーブルのIDをカラムに持つテーブルは、narrow_columns でIDの幅が変わる
+        # 行・列のキーに使っているMatrixは、キーの並び（flat の RowStart 等）が .cs にも入る
+        targets = get_table_targets(name, path)
+        for table, table_path, table_data in get_tables():
+            if table != name and any(col.get('type') == name for col in table_data.get('columns', [])):
+                targets += get_table_targets(table, table_path)
+        for matrix, _, matrix_data in get_matrices():
+            if name in (matrix_data.get('rowId'), matrix_data.get('colId')):
+                targets += get_matrix_targets(matrix)
+        return targets + containers
+    if kind == CLASS_DATA_MATRIX_ID and file == f"{name}.json":
+        return get_matrix_targets(name) + [('/api/generate-all-binary-matrix', None)]
+    if kind == STATE_DATA and file == f"{name}.state.json":
+        return [(f'/api/generate-state/{name}', path)]
+    return []
+
+class DataDirWatcher(threading.Thread):
+    def __init__(self, mode='invalidate', interval=WATCH_INTERVAL):
+        super().__init__(daemon=True, name='data-dir-watcher')
+        if mode not in WATCH_MODES[1:]:
+            raise ValueError(f"Unknown watch mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._snapshot = snapshot_inputs()
+        self._observer = None
+
+    # watchdog があれば変更通知で走査を前倒しする（差分の判定は常にスナップショットの比較）
+    def _start_observer(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return
+        wakeup = self._wakeup
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wakeup.set()
+        self._observer = Observer()
+        self._observer.schedule(Handler(), DATA_DIR, recursive=True)
+        self._observer.start()
+
+    def run(self):
+        self._start_observer()
+        logger.info(f"Watching {DATA_DIR} ({self.mode}, {'watchdog' if self._observer else 'polling'})")
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            if self._wakeup.is_set():
+                # まとめて書き込まれる変更（git pull等）を1回で処理する
+                self._stopped.wait(self.interval / 4)
+                self._wakeup.clear()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error watching {DATA_DIR}: {str(e)}")
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+        self.join()
+
+    # 前回からの変更を処理し、変更されたファイルの一覧を返す
+    def poll(self):
+        snapshot = snapshot_inputs()
+        changed = sorted(path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path))
+        self._snapshot = snapshot
+        for path in changed:
+            invalidate_input_caches(path)
+        if changed:
+            logger.info(f"Detected {len(changed)} changed files in {DATA_DIR}")
+            if self.mode == 'regenerate':
+                self.regenerate([path for path in changed if path in snapshot])
+        return changed
+
+    def regenerate(self, paths):
+        targets = {}
+        for path in paths:
+            for url, body_path in get_regeneration_targets(os.path.relpath(path, DATA_DIR)):
+                targets.setdefault(url, body_path)
+        # 全体の生成（コンテナ・ヘッダー）は個別の生成の後
+        ordered = sorted(targets.items(), key=lambda item: item[0].startswith(('/api/generate-all-', '/api/generate-table-id', '/api/generate-matrix-table-id')))
+        client = app.test_client()
+        for url, body_path in ordered:
+            response = client.post(url, json=read_json_file(body_path)) if body_path else client.post(url)
+            if response.status_code >= 300:
+                logger.warning(f"Regeneration {url} failed: {response.status_code} {response.get_data(as_text=True)[:200]}")
+            else:
+                logger.info(f"Regenerated {url}")
+
+# import完了までの時間（PyInstaller版の起動が遅い場合の切り分け用）
+IMPORT_SECONDS = time.perf_counter() - STARTUP_STARTED
+logger.info(f"app imported in {IMPORT_SECONDS * 1000:.1f} ms")
 
 if __name__ == '__main__':
-    app.run(debug=True, port=8000)
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--serve', choices=['dev', 'threaded'], default=os.environ.get('CHIGADIO_SERVE', 'dev'))
+    parser.add_argument('--host', default=os.environ.get('CHIGADIO_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('CHIGADIO_PORT', '8000')))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('CHIGADIO_THREADS', '8')))
+    parser.add_argument('--precompress-static', action='store_true', help='build/ の静的ファイルに .gz/.br を作成して終了')
+    parser.add_argument('--watch', choices=WATCH_MODES, default=os.environ.get('CHIGADIO_WATCH', 'off'), help='DATA_DIR の変更を監視する（regenerate: 依存する生成処理も実行）')
+    parser.add_argument('--watch-interval', type=float, default=float(os.environ.get('CHIGADIO_WATCH_INTERVAL', WATCH_INTERVAL)))
+    args = parser.parse_args()
+    if args.precompress_static:
+        precompress_static()
+        sys.exit(0)
+    init_data_dir()
+    # 開発サーバーのリローダーは親プロセスでもここを通るため、実際に配信する子プロセスでだけ監視する
+    if args.watch != 'off' and (args.serve == 'threaded' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        DataDirWatcher(args.watch, args.watch_interval).start()
+    logger.info(f"Ready in {(time.perf_counter() - STARTUP_STARTED) * 1000:.1f} ms")
+    if args.serve == 'threaded':
+        serve_threaded(args.host, args.port, args.threads)
+    else:
+        app.run(debug=True, host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,306 @@
+# 生成処理・主要エンドポイントのベンチマーク
+# シード付きで合成したプロジェクト（DATA_DIR）を作り、Flaskのテストクライアントと生成関数を直接計測する
+# 結果は履歴ファイル（JSON）に追記し、同じ条件の前回結果との比較を表示する
+#
+#   python benchmark.py --scale medium
+#   python benchmark.py --tables 8 --rows 2000 --columns 12 --repeat 10 --label "after narrow columns"
+from datetime import datetime, timezone
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, 'benchmark_history.json')
+# 既存ドキュメントの保存はIf-Matchが必須。合成プロジェクトの書き込みは単独なので常に上書きを許可する
+SAVE_HEADERS = {'If-Match': '*'}
+# --data-dir に置く目印。これがあるディレクトリだけを作り直す（任意のディレクトリを消さないため）
+DATA_DIR_MARKER = '.chigadio-benchmark'
+
+# 規模のプリセット（個別の引数で上書き可能）
+SCALES = {
+    'small': {'enums': 4, 'enum_values': 16, 'tables': 4, 'rows': 200, 'columns': 10, 'matrices': 3, 'matrix_size': 16, 'states': 12},
+    'medium': {'enums': 16, 'enum_values': 64, 'tables': 12, 'rows': 2000, 'columns': 16, 'matrices': 6, 'matrix_size': 64, 'states': 48},
+    'large': {'enums': 64, 'enum_values': 256, 'tables': 32, 'rows': 10000, 'columns': 24, 'matrices': 12, 'matrix_size': 256, 'states': 128},
+}
+COLUMN_TYPES = ('int', 'float', 'double', 'bool', 'string', 'vector2', 'vector3', 'enum', 'class')
+MATRIX_STORAGES = ('dense', 'sparse', 'flat')
+STRING_VOCABULARY = [f"text/{i:03d}" for i in range(64)]
+STATE_LABELS = ('Idle', 'Move', 'Attack', 'Guard', 'Skill', 'Damage', 'Dead', 'Result')
+CLASS_NAME = 'BenchItem'
+
+def check(response):
+    if response.status_code >= 300:
+        raise RuntimeError(f"{response.request.method} {response.request.path}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+    return response
+
+def random_cell(rng, column_type, enums):
+    if column_type == 'int':
+        return rng.randint(-100000, 100000)
+    if column_type in ('float', 'double'):
+        return round(rng.uniform(-1000, 1000), 3)
+    if column_type == 'bool':
+        return rng.random() < 0.5
+    if column_type == 'string':
+        return rng.choice(STRING_VOCABULARY)
+    if column_type == 'vector2':
+        return [round(rng.uniform(-10, 10), 3) for _ in range(2)]
+    if column_type == 'vector3':
+        return [round(rng.uniform(-10, 10), 3) for _ in range(3)]
+    if column_type == CLASS_NAME:
+        return {'count': rng.randint(0, 99), 'rate': round(rng.random(), 3), 'tags': rng.sample(STRING_VOCABULARY, rng.randint(0, 3))}
+    # Enum
+    return f"{column_type}.V{rng.randint(1, len(enums[column_type]))}"
+
+# 合成プロジェクトをAPI経由で作成する（UIからの保存と同じ経路・同じ形式）
+def generate_project(client, rng, params):
+    enums = {}
+    for i in range(params['enums']):
+        name = f"BenchEnum{i}"
+        check(client.post('/api/enum-id', json={'name': name}))
+        values = [{'property': f"V{j}", 'value': j, 'description': ''} for j in range(1, params['enum_values'] + 1)]
+        check(client.post(f'/api/enum/{name}', headers=SAVE_HEADERS, json=values))
+        enums[name] = values
+
+    check(client.post('/api/class-data', json={'name': CLASS_NAME}))
+    check(client.post(f'/api/class-data/{CLASS_NAME}', headers=SAVE_HEADERS, json=[
+        {'name': 'count', 'type': 'int', 'arraySize': 0, 'description': ''},
+        {'name': 'rate', 'type': 'float', 'arraySize': 0, 'description': ''},
+        {'name': 'tags', 'type': 'string', 'arraySize': -1, 'description': ''},
+    ]))
+
+    tables = {}
+    for i in range(params['tables']):
+        name = f"BenchTable{i}"
+        columns = []
+        for j in range(params['columns']):
+            column_type = COLUMN_TYPES[j % len(COLUMN_TYPES)]
+            if column_type == 'enum':
+                column_type = rng.choice(list(enums)) if enums else 'int'
+            elif column_type == 'class':
+                column_type = CLASS_NAME
+            columns.append({'name': f"c{j}", 'type': column_type})
+        rows = [
+            {'id': r, 'enum_property': f"R{r}", 'data': {col['name']: {'value': random_cell(rng, col['type'], enums)} for col in columns}}
+            for r in range(1, params['rows'] + 1)
+        ]
+        table = {'columns': columns, 'rows': rows}
+        check(client.post('/api/class-data-id', json={'name': name}))
+        check(client.post(f'/api/class-data-id/{name}', headers=SAVE_HEADERS, json=table))
+        tables[name] = table
+
+    matrices = {}
+    table_names = list(tables)
+    size = min(params['matrix_size'], params['rows'])
+    for i in range(params['matrices'] if table_names else 0):
+        name = f"BenchMatrix{i}"
+        row_table = table_names[i % len(table_names)]
+        col_table = table_names[(i + 1) % len(table_names)]
+        matrix = {
+            'name': name, 'rowId': row_table, 'colId': col_table,
+            'storage': MATRIX_STORAGES[i % len(MATRIX_STORAGES)],
+            'fields': [{'name': 'mul', 'type': 'float', 'description': ''}, {'name': 'flat', 'type': 'int', 'description': ''}],
+            'data': {},
+        }
+        check(client.post('/api/class-data-matrix-id', json=matrix))
+        # 疎行列形式が意味を持つよう、大半のセルは既定値
+        matrix['data'] = {
+            f"R{r}": {f"R{c}": ({'mul': 1.0, 'flat': 0} if rng.random() < 0.8 else {'mul': round(rng.uniform(0, 4), 2), 'flat': rng.randint(0, 50)}) for c in range(1, size + 1)}
+            for r in range(1, size + 1)
+        }
+        check(client.post(f'/api/class-data-matrix-id/{name}', headers=SAVE_HEADERS, json=matrix))
+        matrices[name] = matrix
+
+    states = {}
+    if params['states']:
+        name = 'BenchState'
+        ids = [str(n) for n in range(1, params['states'] + 1)]
+        nodes = [
+            {'id': node_id, 'data': {'label': rng.choice(STATE_LABELS), 'targets': rng.sample(ids, min(len(ids), rng.randint(1, 3)))}}
+            for node_id in ids
+        ]
+        state = {'nodes': nodes, 'edges': [], 'manager': []}
+        check(client.post('/api/state-data', json={'name': name}))
+        check(client.post(f'/api/state-data/{name}', headers=SAVE_HEADERS, json=state))
+        states[name] = state
+    return {'enums': enums, 'tables': tables, 'matrices': matrices, 'states': states}
+
+# (名前, 関数) の一覧。関数は1回分の処理
+def get_benchmarks(app, client, project):
+    tables, matrices, states = project['tables'], project['matrices'], project['states']
+    first_table = next(iter(tables), None)
+    first_matrix = next(iter(matrices), None)
+    benchmarks = []
+
+    def encode_tables():
+        for name, table in tables.items():
+            app.generate_binary_data(name, table)
+    def encode_matrices():
+        for name, matrix in matrices.items():
+            app.generate_binary_matrix_data(name, matrix)
+    class_cells = [
+        row['data'][col['name']]['value']
+        for table in tables.values() for col in table['columns'] if col['type'] == CLASS_NAME
+        for row in table['rows']
+    ]
+    def write_class_cells():
+        _, _, enum_list, class_list, _ = app.get_type_lists()
+        buffer = io.BytesIO()
+        for value in class_cells:
+            app.write_binary_field(buffer, value, CLASS_NAME, enum_list, class_list)
+    benchmarks += [('generate_binary_data', encode_tables), ('generate_binary_matrix_data', encode_matrices)]
+    if class_cells:
+        benchmarks.append(('write_binary_field', write_class_cells))
+
+    def route(method, path, **kwargs):
+        return lambda: check(client.open(path, method=method, **kwargs))
+    benchmarks += [
+        ('POST /api/generate-all-enums', route('POST', '/api/generate-all-enums')),
+        ('POST /api/generate-all-binary', route('POST', '/api/generate-all-binary')),
+        ('POST /api/generate-all-cs-header', route('POST', '/api/generate-all-cs-header')),
+        ('POST /api/generate-all-binary-matrix', route('POST', '/api/generate-all-binary-matrix')),
+        ('GET /api/enum-id', route('GET', '/api/enum-id')),
+        ('GET /api/class-data-id', route('GET', '/api/class-data-id')),
+    ]
+    if first_table:
+        benchmarks += [
+            ('POST /api/generate-binary/<table>', route('POST', f'/api/generate-binary/{first_table}', json=tables[first_table])),
+            ('POST /api/generate-class-data-id/<table>', route('POST', f'/api/generate-class-data-id/{first_table}', json=tables[first_table])),
+            ('GET /api/class-data-id/<table>', route('GET', f'/api/class-data-id/{first_table}')),
+            ('POST /api/class-data-id/<table>', route('POST', f'/api/class-data-id/{first_table}', headers=SAVE_HEADERS, json=tables[first_table])),
+        ]
+    if first_matrix:
+        benchmarks += [
+            ('POST /api/generate-binary-matrix/<matrix>', route('POST', f'/api/generate-binary-matrix/{first_matrix}')),
+            ('GET /api/class-data-matrix-id/<matrix>', route('GET', f'/api/class-data-matrix-id/{first_matrix}')),
+        ]
+    for name, state in states.items():
+        benchmarks += [
+            ('POST /api/generate-state/<state>', route('POST', f'/api/generate-state/{name}', json=state)),
+            ('GET /api/state-data/<state>', route('GET', f'/api/state-data/{name}')),
+        ]
+    return benchmarks
+
+def measure(func, repeat, warmup):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'stdev_ms': round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        'repeat': repeat,
+    }
+
+def get_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def append_history(path, entry):
+    history = load_history(path)
+    history.append(entry)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+# 同じ規模・シードの直近の結果と中央値を比較して表示
+def print_results(results, previous):
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'median ms':>10}  {'min ms':>10}  {'vs prev':>8}")
+    for name, stats in results.items():
+        prev = previous['results'].get(name) if previous else None
+        ratio = f"{stats['median_ms'] / prev['median_ms']:.2f}x" if prev and prev['median_ms'] else '-'
+        print(f"{name:<{width}}  {stats['median_ms']:>10.3f}  {stats['min_ms']:>10.3f}  {ratio:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the generators and main API routes on a synthetic project.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for key in SCALES['small']:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, dest=key, help=f"override {key} of the scale preset")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--filter', default='', help='run only benchmarks whose name contains this text')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--label', default='')
+    parser.add_argument('--data-dir', help='keep the generated project in this directory instead of a temporary one')
+    parser.add_argument('--no-history', action='store_true')
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    params.update({key: getattr(args, key) for key in params if getattr(args, key) is not None})
+
+    data_dir = os.path.abspath(args.data_dir) if args.data_dir else tempfile.mkdtemp(prefix='chigadio-bench-')
+    if args.data_dir:
+        if os.path.isdir(data_dir) and os.listdir(data_dir):
+            if not os.path.exists(os.path.join(data_dir, DATA_DIR_MARKER)):
+                parser.error(f"--data-dir {data_dir} is not empty and was not created by this tool")
+            shutil.rmtree(data_dir)
+        os.makedirs(data_dir, exist_ok=True)
+        with open(os.path.join(data_dir, DATA_DIR_MARKER), 'w', encoding='utf-8'):
+            pass
+    # appのimport前に設定する（キャッシュ・プロファイルが結果に混ざらないよう無効化）
+    os.environ['CHIGADIO_DATA_DIR'] = data_dir
+    os.environ.setdefault('CHIGADIO_LOG_LEVEL', 'WARNING')
+    for name in ('CHIGADIO_BUILD_CACHE_DIR', 'CHIGADIO_PROFILING'):
+        os.environ.pop(name, None)
+    sys.path.insert(0, BENCH_DIR)
+    import app
+
+    try:
+        client = app.app.test_client()
+        started = time.perf_counter()
+        project = generate_project(client, random.Random(args.seed), params)
+        print(f"Generated project in {data_dir} ({(time.perf_counter() - started):.1f} s): {params}")
+        results = {}
+        for name, func in get_benchmarks(app, client, project):
+            if args.filter in name:
+                results[name] = measure(func, args.repeat, args.warmup)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    if not results:
+        sys.exit(f"No benchmarks matched --filter {args.filter!r}")
+
+    entry = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': get_revision(),
+        'label': args.label,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': args.scale,
+        'seed': args.seed,
+        'params': params,
+        'results': results,
+    }
+    previous = next((e for e in reversed(load_history(args.history)) if e['params'] == params and e['seed'] == args.seed), None)
+    print_results(results, previous)
+    if not args.no_history:
+        append_history(args.history, entry)
+        print(f"Appended results to {args.history}")
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent, DialogActions, Autocomplete } from '@mui/material';
+import { fetchJson, writeDocument } from '../services/api';
 import AddIcon from '@mui/icons-material/Add';
 
 function ClassDataDetailGrid() {
@@ -18,8 +19,7 @@ function ClassDataDetailGrid() {
 
   // Fetch data for the class
   useEffect(() => {
-    fetch(`/api/class-data/${name}`)
-      .then(response => response.json())
+    fetchJson(`/api/class-data/${name}`)
       .then(fetchedData => {
         setData(fetchedData.map((item, index) => ({ ...item, id: item.id || index + 1 })));
         setLoading(false);
@@ -36,8 +36,8 @@ function ClassDataDetailGrid() {
     const unityTypes = ['GameObject', 'Transform', 'Vector2', 'Vector3', 'Vector4', 'Quaternion', 'Color', 'Rect', 'Bounds', 'Matrix4x4', 'AnimationCurve', 'Sprite', 'Texture', 'Material', 'Mesh', 'Rigidbody', 'Collider', 'AudioClip', 'ScriptableObject'];
 
     Promise.all([
-      fetch('/api/enum-id').then(res => res.json()),
-      fetch('/api/class-data').then(res => res.json())
+      fetchJson('/api/enum-id'),
+      fetchJson('/api/class-data')
     ]).then(([enumList, classList]) => {
       const enumTypes = enumList.map(item => item.name);
       const classTypes = classList.map(item => item.name);
@@ -83,22 +83,26 @@ function ClassDataDetailGrid() {
 
   // Save data
   const handleSave = () => {
-    fetch(`/api/class-data/${name}`, {
+    writeDocument(`/api/class-data/${name}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data),
     })
       .then(response => response.json())
-      .then(result => alert(result.message))
+      .then(result => {
+        if (result.error) throw new Error(result.error);
+        alert(result.message);
+      })
       .catch(error => alert('Error saving data: ' + error));
   };
 
   // Delete class
   const handleDelete = () => {
     if (window.confirm(`Delete ${name}?`)) {
-      fetch(`/api/class-data/${name}`, { method: 'DELETE' })
+      writeDocument(`/api/class-data/${name}`, { method: 'DELETE' })
         .then(response => response.json())
         .then(result => {
+          if (result.error) throw new Error(result.error);
           alert(result.message);
           navigate('/class-data');
         })
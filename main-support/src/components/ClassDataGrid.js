@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent, DialogActions } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
+import { fetchJson } from '../services/api';
 
 function ClassDataGrid() {
   const navigate = useNavigate();
@@ -12,13 +13,10 @@ function ClassDataGrid() {
 
   // データ取得
   useEffect(() => {
-    fetch('/api/class-data')
-      .then(response => {
-        if (!response.ok) {
-          console.warn(`HTTPエラー！ステータス: ${response.status}`);
-          return [];
-        }
-        return response.json();
+    fetchJson('/api/class-data')
+      .catch(error => {
+        console.warn(`HTTPエラー！ステータス: ${error.status}`);
+        return [];
       })
       .then(fetchedData => {
         console.log('取得したクラスデータ:', fetchedData);
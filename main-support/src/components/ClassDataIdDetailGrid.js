@@ -5,6 +5,7 @@ import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent,
 import AddIcon from '@mui/icons-material/Add';
 import DeleteIcon from '@mui/icons-material/Delete';
 import Papa from 'papaparse';
+import { fetchJson, writeDocument } from '../services/api';
 import { useMemo } from 'react';
 function ClassDataIdDetailGrid() {
   const { name } = useParams();
@@ -47,17 +48,7 @@ const gridRows = useMemo(() => {
 
     setLoading(true);
 
-    fetch(`/api/class-data-id/${encodeURIComponent(name)}`)
-      .then(response => {
-        if (!response.ok) {
-          throw new Error(`データ取得に失敗しました: ${name} (${response.status} ${response.statusText})`);
-        }
-        const contentType = response.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          throw new Error('サーバーからJSON以外のレスポンスを受信しました');
-        }
-        return response.json();
-      })
+    fetchJson(`/api/class-data-id/${encodeURIComponent(name)}`)
       .then(fetchedData => {
         const rows = (fetchedData.rows || []).map((row, index) => ({
           id: row.id || index + 1,
@@ -85,30 +76,9 @@ const gridRows = useMemo(() => {
       });
 
     Promise.all([
-      fetch('/api/enum-id').then(res => {
-        if (!res.ok) throw new Error(`enum-id取得に失敗: ${res.status}`);
-        const contentType = res.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          throw new Error('enum-idエンドポイントからJSON以外のレスポンスを受信');
-        }
-        return res.json();
-      }),
-      fetch('/api/class-data').then(res => {
-        if (!res.ok) throw new Error(`class-data取得に失敗: ${res.status}`);
-        const contentType = res.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          throw new Error('class-dataエンドポイントからJSON以外のレスポンスを受信');
-        }
-        return res.json();
-      }),
-      fetch('/api/class-data-id').then(res => {
-        if (!res.ok) throw new Error(`class-id-data取得に失敗: ${res.status}`);
-        const contentType = res.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          throw new Error('class-id-dataエンドポイントからJSON以外のレスポンスを受信');
-        }
-        return res.json();
-      }),
+      fetchJson('/api/enum-id'),
+      fetchJson('/api/class-data'),
+      fetchJson('/api/class-data-id'),
     ]).then(([enumList, classList, classIdList]) => {
       const basicTypes = ['int', 'float', 'bool', 'string'];
       const unityTypes = ['Vector2', 'Vector3'];
@@ -118,35 +88,21 @@ const gridRows = useMemo(() => {
       setTypeOptions([...basicTypes, ...unityTypes, ...enumTypes, ...classTypes, ...classIdTypes]);
 
       const enumPromises = enumList.map(enumItem =>
-        fetch(`/api/enum/${encodeURIComponent(enumItem.name)}`)
-          .then(res => {
-            if (!res.ok) {
-              console.warn(`enum値取得に失敗: ${enumItem.name} (${res.status})`);
-              return [];
-            }
-            const contentType = res.headers.get('content-type');
-            if (!contentType || !contentType.includes('application/json')) {
-              throw new Error(`enum ${enumItem.name} のレスポンスがJSONではありません`);
-            }
-            return res.json();
+        fetchJson(`/api/enum/${encodeURIComponent(enumItem.name)}`)
+          .catch(error => {
+            console.warn(`enum値取得に失敗: ${enumItem.name} (${error.status})`);
+            return [];
           })
           .then(data => ({ [enumItem.name]: data || [] }))
       );
 
       const classIdPromises = classIdList.map(classIdItem =>
-        fetch(`/api/class-data-id/${encodeURIComponent(classIdItem.name)}`)
-          .then(res => {
-            if (!res.ok) {
-              console.warn(`classId値取得に失敗: ${classIdItem.name} (${res.status})`);
-              return [];
-            }
-            const contentType = res.headers.get('content-type');
-            if (!contentType || !contentType.includes('application/json')) {
-              throw new Error(`classId ${classIdItem.name} のレスポンスがJSONではありません`);
-            }
-            return res.json();
+        fetchJson(`/api/class-data-id/${encodeURIComponent(classIdItem.name)}`)
+          .catch(error => {
+            console.warn(`classId値取得に失敗: ${classIdItem.name} (${error.status})`);
+            return { rows: [] };
           })
-          .then(data => ({ [classIdItem.name]: data.rows.map(row => row.enum_property) || [] }))
+          .then(data => ({ [classIdItem.name]: (data.rows || []).map(row => row.enum_property) }))
       );
 
       return Promise.all([...enumPromises, ...classIdPromises]);
@@ -292,7 +248,7 @@ const handleSave = () => {
     }))
   };
 
-  fetch(`/api/class-data-id/${encodeURIComponent(name)}`, {
+  writeDocument(`/api/class-data-id/${encodeURIComponent(name)}`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(saveData),
@@ -307,7 +263,7 @@ const handleSave = () => {
 
   const handleDelete = () => {
     if (window.confirm(`${name} を削除しますか？`)) {
-      fetch(`/api/class-data-id/${encodeURIComponent(name)}`, { method: 'DELETE' })
+      writeDocument(`/api/class-data-id/${encodeURIComponent(name)}`, { method: 'DELETE' })
         .then(response => {
           if (!response.ok) throw new Error(`${name} の削除に失敗`);
           return response.json();
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Dialog, DialogTitle, DialogContent, DialogActions, TextField } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
+import { fetchJson } from '../services/api';
 
 function ClassDataIdGrid() {
   const [classDataIdData, setClassDataIdData] = useState([]);
@@ -10,15 +11,7 @@ function ClassDataIdGrid() {
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetch('/api/class-data-id')
-      .then(response => {
-        if (!response.ok) throw new Error(`class-data-id取得に失敗: ${response.status}`);
-        const contentType = response.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          throw new Error('class-data-idエンドポイントからJSON以外のレスポンスを受信');
-        }
-        return response.json();
-      })
+    fetchJson('/api/class-data-id')
       .then(data => {
         const validData = data.filter(item => item.name && !item.name.includes(':') && typeof item.name === 'string');
         if (validData.length !== data.length) {
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useMemo } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { DataGrid, useGridApiRef } from '@mui/x-data-grid';
 import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent, DialogActions, Autocomplete, Tooltip, createTheme, ThemeProvider } from '@mui/material';
+import { fetchJson, writeDocument } from '../services/api';
 import AddIcon from '@mui/icons-material/Add';
 import DeleteIcon from '@mui/icons-material/Delete';
 import SaveIcon from '@mui/icons-material/Save';
@@ -125,11 +126,7 @@ function ClassDataMatrixIdDetailGrid() {
     }
 
     setLoading(true);
-    fetch(`/api/class-data-matrix-id/${encodeURIComponent(name)}`)
-      .then(response => {
-        if (!response.ok) throw new Error(`データ取得に失敗: ${response.status}`);
-        return response.json();
-      })
+    fetchJson(`/api/class-data-matrix-id/${encodeURIComponent(name)}`)
       .then(fetchedData => {
         setData(fetchedData);
         setLoading(false);
@@ -140,9 +137,9 @@ function ClassDataMatrixIdDetailGrid() {
       });
 
     Promise.all([
-      fetch('/api/enum-id').then(res => res.json()),
-      fetch('/api/class-data').then(res => res.json()),
-      fetch('/api/class-data-id').then(res => res.json())
+      fetchJson('/api/enum-id'),
+      fetchJson('/api/class-data'),
+      fetchJson('/api/class-data-id')
     ]).then(([enumList, classList, classIdList]) => {
       const basicTypes = ['int', 'float', 'bool', 'string'];
       const unityTypes = ['Vector2', 'Vector3'];
@@ -152,13 +149,11 @@ function ClassDataMatrixIdDetailGrid() {
       setTypeOptions([...basicTypes, ...unityTypes, ...enumTypes, ...classTypes, ...classIdTypes]);
 
       const enumPromises = enumList.map(e =>
-        fetch(`/api/enum/${encodeURIComponent(e.name)}`)
-          .then(res => res.json())
+        fetchJson(`/api/enum/${encodeURIComponent(e.name)}`)
           .then(d => ({ [e.name]: d }))
       );
       const classIdPromises = classIdList.map(c =>
-        fetch(`/api/class-data-id/${encodeURIComponent(c.name)}`)
-          .then(res => res.json())
+        fetchJson(`/api/class-data-id/${encodeURIComponent(c.name)}`)
           .then(d => ({ [c.name]: d.rows.map(r => r.enum_property) }))
       );
       Promise.all([...enumPromises, ...classIdPromises]).then(results => {
@@ -271,21 +266,25 @@ function ClassDataMatrixIdDetailGrid() {
   };
 
   const handleSave = () => {
-    fetch(`/api/class-data-matrix-id/${encodeURIComponent(name)}`, {
+    writeDocument(`/api/class-data-matrix-id/${encodeURIComponent(name)}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(data)
     })
       .then(response => response.json())
-      .then(result => alert(result.message))
+      .then(result => {
+        if (result.error) throw new Error(result.error);
+        alert(result.message);
+      })
       .catch(error => alert('保存エラー: ' + error.message));
   };
 
   const handleDelete = () => {
     if (window.confirm(`${name} を削除しますか？`)) {
-      fetch(`/api/class-data-matrix-id/${encodeURIComponent(name)}`, { method: 'DELETE' })
+      writeDocument(`/api/class-data-matrix-id/${encodeURIComponent(name)}`, { method: 'DELETE' })
         .then(response => response.json())
         .then(result => {
+          if (result.error) throw new Error(result.error);
           alert(result.message);
           navigate('/class-data-matrix-id');
         })
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Dialog, DialogTitle, DialogContent, DialogActions, TextField, Autocomplete } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
+import { fetchJson } from '../services/api';
 
 function ClassDataMatrixIdGrid() {
   const [matrixData, setMatrixData] = useState([]);
@@ -13,14 +14,13 @@ function ClassDataMatrixIdGrid() {
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetch('/api/class-data-matrix-id')
-      .then(response => response.json())
+    fetchJson('/api/class-data-matrix-id')
       .then(data => setMatrixData(data))
       .catch(error => console.error('データ取得エラー:', error));
 
     Promise.all([
-      fetch('/api/enum-id').then(res => res.json()),
-      fetch('/api/class-data-id').then(res => res.json())
+      fetchJson('/api/enum-id'),
+      fetchJson('/api/class-data-id')
     ])
       .then(([enumList, classIdList]) => {
         setTypeOptions([...enumList.map(item => item.name), ...classIdList.map(item => item.name)]);
@@ -36,8 +36,8 @@ function ClassDataMatrixIdGrid() {
     try {
       // enum値を取得
       const [rowEnumRes, colEnumRes] = await Promise.all([
-        fetch(`/api/enum/${encodeURIComponent(newRowId)}`).then(res => res.json()),
-        fetch(`/api/enum/${encodeURIComponent(newColId)}`).then(res => res.json())
+        fetchJson(`/api/enum/${encodeURIComponent(newRowId)}`),
+        fetchJson(`/api/enum/${encodeURIComponent(newColId)}`)
       ]);
       const rowKeys = rowEnumRes || [];
       const colKeys = colEnumRes || [];
@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent, DialogActions } from '@mui/material';
 import AddIcon from '@mui/icons-material/Add';
+import { fetchJson, writeDocument } from '../services/api';
 
 function EnumDetailGrid() {
   const { name } = useParams();
@@ -18,8 +19,7 @@ function EnumDetailGrid() {
 
   // データ取得
   useEffect(() => {
-    fetch(`/api/enum/${name}`)
-      .then(response => response.json())
+    fetchJson(`/api/enum/${name}`)
       .then(data => {
         const validData = data
           .filter(item => !isNaN(parseFloat(item.value)) && isFinite(item.value))
@@ -113,13 +113,14 @@ function EnumDetailGrid() {
   const handleSave = () => {
     const validData = data.filter(item => !isNaN(item.value) && isFinite(item.value));
     console.log('Saving data:', validData);
-    fetch(`/api/enum/${name}`, {
+    writeDocument(`/api/enum/${name}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(validData),
     })
       .then(response => response.json())
       .then(result => {
+        if (result.error) throw new Error(result.error);
         alert(result.message);
         setOriginalData(validData); // 保存後にoriginalDataを更新
       })
@@ -129,9 +130,10 @@ function EnumDetailGrid() {
   // 削除
   const handleDelete = () => {
     if (window.confirm(`${name}.json を削除しますか？`)) {
-      fetch(`/api/enum/${name}`, { method: 'DELETE' })
+      writeDocument(`/api/enum/${name}`, { method: 'DELETE' })
         .then(response => response.json())
         .then(result => {
+          if (result.error) throw new Error(result.error);
           alert(result.message);
           navigate('/'); // トップページに戻る
         })
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Dialog, DialogTitle, DialogContent, DialogActions, TextField } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
-import { fetchEnumIdData } from '../services/api';
+import { fetchEnumIdData, getCachedEtag, writeDocument } from '../services/api';
 
 function EnumIdGrid() {
   const [enumIdData, setEnumIdData] = useState([]);
@@ -42,7 +42,8 @@ function EnumIdGrid() {
   // Enum削除
   const handleDeleteEnum = (name) => {
     if (window.confirm(`Delete ${name}?`)) {
-      fetch(`/api/enum/${name}`, { method: 'DELETE' })
+      // 一覧からの削除は詳細を開いていなければ内容を問わず削除する
+      writeDocument(`/api/enum/${name}`, { method: 'DELETE', headers: { 'If-Match': getCachedEtag(`/api/enum/${name}`) || '*' } })
         .then(response => response.json())
         .then(result => {
           if (result.error) throw new Error(result.error);
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams } from 'react-router-dom';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent, DialogActions, Grid, Card, CardContent, IconButton, Autocomplete, List, ListItem, ListItemText } from '@mui/material';
+import { fetchJson, writeDocument } from '../services/api';
 import AddIcon from '@mui/icons-material/Add';
 import DeleteIcon from '@mui/icons-material/Delete';
 import CloseIcon from '@mui/icons-material/Close';
@@ -194,14 +195,12 @@ function StateDetailGrid() {
     setLoading(true);
     const fetchData = async () => {
       try {
-        const response = await fetch(`/api/state-data/${name}`);
-        const data = await response.json();
+        const data = await fetchJson(`/api/state-data/${name}`);
         let validData = typeof data === 'object' && !Array.isArray(data) ? data : { transitions: [], manager: [], base: [], edges: [], nodes: [] };
 
         if (Array.isArray(data) && data.length === 0) {
           validData = { transitions: [], manager: [], base: [], edges: [], nodes: [] };
-          const reResponse = await fetch(`/api/state-data/${name}`);
-          validData = await reResponse.json();
+          validData = await fetchJson(`/api/state-data/${name}`);
         }
 
         const validTransitions = Array.isArray(validData.transitions)
@@ -278,8 +277,8 @@ function StateDetailGrid() {
       const unityTypes = ['GameObject', 'Transform', 'Vector2', 'Vector3', 'Vector4', 'Quaternion', 'Color', 'Rect', 'Bounds', 'Matrix4x4', 'AnimationCurve', 'Sprite', 'Texture', 'Material', 'Mesh', 'Rigidbody', 'Collider', 'AudioClip', 'ScriptableObject'];
       try {
         const [enumResponse, classResponse] = await Promise.all([
-          fetch('/api/enum-id').then(res => res.json()).catch(() => []),
-          fetch('/api/class-data').then(res => res.json()).catch(() => []),
+          fetchJson('/api/enum-id').catch(() => []),
+          fetchJson('/api/class-data').catch(() => []),
         ]);
         const enumTypes = Array.isArray(enumResponse) ? enumResponse.map(item => item.name || '') : [];
         const classTypes = Array.isArray(classResponse) ? classResponse.map(item => item.name || '') : [];
@@ -302,12 +301,13 @@ function StateDetailGrid() {
         nodes: flowElements.nodes,
         edges: flowElements.edges,
       };
-      const response = await fetch(`/api/state-data/${name}`, {
+      const response = await writeDocument(`/api/state-data/${name}`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(data),
       });
       const result = await response.json();
+      if (result.error) throw new Error(result.error);
       alert(result.message || 'データを保存しました');
     } catch (error) {
       console.error('データの保存エラー:', error);
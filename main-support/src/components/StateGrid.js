@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { DataGrid } from '@mui/x-data-grid';
 import { Button, Box, Typography, TextField, Dialog, DialogTitle, DialogContent, DialogActions } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
+import { fetchJson, getCachedEtag, writeDocument } from '../services/api';
 
 function StateGrid() {
   const navigate = useNavigate();
@@ -12,8 +13,7 @@ function StateGrid() {
 
   // データ取得
   useEffect(() => {
-    fetch('/api/state-data')
-      .then(response => response.json())
+    fetchJson('/api/state-data')
       .then(fetchedData => {
         console.log('Raw fetched state-data:', fetchedData);
         // API から返されるデータは [{ id, name }] の形式
@@ -63,8 +63,10 @@ function StateGrid() {
   // 状態を削除
   const handleDelete = (name) => {
     if (window.confirm(`${name}.state.json を削除しますか？`)) {
-      fetch(`/api/state-data/${name}`, {
+      // 一覧からの削除は詳細を開いていなければ内容を問わず削除する
+      writeDocument(`/api/state-data/${name}`, {
         method: 'DELETE',
+        headers: { 'If-Match': getCachedEtag(`/api/state-data/${name}`) || '*' },
       })
         .then(response => response.json())
         .then(result => {
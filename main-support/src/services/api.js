@@ -1,5 +1,55 @@
+// URLごとに最後に受け取ったETagと本文を保持し、If-None-Matchで再検証する（304なら保持している本文を返す）
+// 呼び出し側が結果を書き換えてもキャッシュに影響しないよう、本文は文字列で持ち毎回パースする
+// 2xx/304以外はErrorを投げる（error.status にステータス）
+const documentCache = new Map();
+
+export const fetchJson = async (url, options = {}) => {
+  const cached = documentCache.get(url);
+  const headers = { ...(options.headers || {}) };
+  if (cached && cached.body !== null) {
+    headers['If-None-Match'] = cached.etag;
+  }
+  const response = await fetch(url, { ...options, headers });
+  if (response.status === 304 && cached) {
+    return JSON.parse(cached.body);
+  }
+  if (!response.ok) {
+    documentCache.delete(url);
+    const error = new Error(`${url}: ${response.status} ${response.statusText}`);
+    error.status = response.status;
+    throw error;
+  }
+  const body = await response.text();
+  const etag = response.headers.get('ETag');
+  if (etag) {
+    documentCache.set(url, { etag, body });
+  } else {
+    documentCache.delete(url);
+  }
+  return JSON.parse(body);
+};
+
+// 最後に取得したETag（保存時のIf-Match用）
+export const getCachedEtag = (url) => documentCache.get(url)?.etag;
+
+// ドキュメントの保存・削除: 最後に取得したETagをIf-Matchで送る（他で保存済みなら409、未取得なら428）
+// 保存に成功したら新しいETagだけ保持し、本文は次のGETで取り直す
+export const writeDocument = async (url, options = {}) => {
+  const headers = { ...(options.headers || {}) };
+  const etag = getCachedEtag(url);
+  if (etag && !headers['If-Match']) {
+    headers['If-Match'] = etag;
+  }
+  const response = await fetch(url, { ...options, headers });
+  const newEtag = response.headers.get('ETag');
+  if (response.ok && newEtag && options.method !== 'DELETE') {
+    documentCache.set(url, { etag: newEtag, body: null });
+  } else if (response.ok) {
+    documentCache.delete(url);
+  }
+  return response;
+};
+
 export const fetchEnumIdData = async () => {
-  const response = await fetch('/api/enum-id');
-  const data = await response.json();
-  return data;
-};
\ No newline at end of file
+  return fetchJson('/api/enum-id');
+};
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as A
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(A, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(A, '_data_dir_initialized', False)
+    monkeypatch.setattr(A, '_document_cache', {})
+    monkeypatch.delenv(A.BUILD_CACHE_DIR_ENV, raising=False)
+    monkeypatch.setenv(A.REQUIRE_IF_MATCH_ENV, '0')
+    return A.app.test_client()
+
+
+@pytest.mark.parametrize('settings', [
+    {'compression': 'lzma'},
+    {'compression': ['deflate']},
+    {'matrix_storage': 'diagonal'},
+    {'string_pool': 'yes'},
+    {'narrow_columns': 1},
+    {'unknown': True},
+])
+def test_invalid_settings_are_rejected(client, settings):
+    assert client.post('/api/build-settings', json=settings).status_code == 400
+    assert client.get('/api/build-settings').get_json() == A.DEFAULT_BUILD_SETTINGS
+
+
+def test_valid_settings_are_saved(client):
+    settings = {'compression': 'deflate', 'matrix_storage': 'sparse', 'string_pool': True}
+    assert client.post('/api/build-settings', json=settings).status_code == 200
+    assert client.get('/api/build-settings').get_json() == {**A.DEFAULT_BUILD_SETTINGS, **settings}
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as A
+
+VALUES = [{'property': 'Fire', 'value': 1, 'description': ''}]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(A, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(A, '_data_dir_initialized', False)
+    monkeypatch.setattr(A, '_document_cache', {})
+    monkeypatch.delenv(A.BUILD_CACHE_DIR_ENV, raising=False)
+    monkeypatch.delenv(A.REQUIRE_IF_MATCH_ENV, raising=False)
+    client = A.app.test_client()
+    assert client.post('/api/enum-id', json={'name': 'Element'}).status_code < 300
+    assert client.post('/api/enum/Element', json=VALUES, headers={'If-Match': '*'}).status_code < 300
+    return client
+
+
+def test_stale_if_match_is_rejected(client):
+    etag = client.get('/api/enum/Element').headers['ETag']
+    # 別の人が先に保存する
+    first = client.post('/api/enum/Element', json=VALUES + [{'property': 'Water', 'value': 2, 'description': ''}], headers={'If-Match': etag})
+    assert first.status_code == 200
+    assert first.headers['ETag'] != etag
+    stale = client.post('/api/enum/Element', json=VALUES, headers={'If-Match': etag})
+    assert stale.status_code == 409
+    assert stale.headers['ETag'] == first.headers['ETag']
+    assert client.post('/api/enum/Element', json=VALUES, headers={'If-Match': first.headers['ETag']}).status_code == 200
+
+
+def test_missing_if_match_is_required(client, monkeypatch):
+    assert client.post('/api/enum/Element', json=VALUES).status_code == 428
+    assert client.delete('/api/enum/Element').status_code == 428
+    monkeypatch.setenv(A.REQUIRE_IF_MATCH_ENV, '0')
+    assert client.post('/api/enum/Element', json=VALUES).status_code == 200
+
+
+def test_if_match_uses_strong_comparison(client):
+    etag = client.get('/api/enum/Element').headers['ETag']
+    assert client.post('/api/enum/Element', json=VALUES, headers={'If-Match': f'W/{etag}'}).status_code == 409
+    # If-None-Matchは弱い比較
+    assert client.get('/api/enum/Element', headers={'If-None-Match': f'W/{etag}'}).status_code == 304
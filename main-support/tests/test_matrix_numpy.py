@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as A
+
+KEYS = ['A', 'B', 'C']
+FIELDS = [
+    {'name': 'mul', 'type': 'float'},
+    {'name': 'flat', 'type': 'int'},
+    {'name': 'ok', 'type': 'bool'},
+    {'name': 'v', 'type': 'Vector2'},
+]
+
+pytest.importorskip('numpy')
+
+
+@pytest.fixture(autouse=True)
+def enums(monkeypatch):
+    monkeypatch.setattr(A, 'get_enum_values', lambda: {'Key': KEYS})
+
+
+def matrix(**overrides):
+    data = {}
+    for r, rk in enumerate(KEYS):
+        data[rk] = {}
+        for c, ck in enumerate(KEYS):
+            data[rk][ck] = {'mul': r * 0.5 + c, 'flat': r - c, 'ok': (r + c) % 2 == 0, 'v': [float(r), float(c)]}
+    data['B']['C'].update(overrides)
+    return {'rowId': 'Key', 'colId': 'Key', 'fields': FIELDS, 'data': data}
+
+
+def pack(json_data, monkeypatch, numpy):
+    with monkeypatch.context() as m:
+        if not numpy:
+            m.setattr(A, 'get_optional_module', lambda name: None)
+        try:
+            return bytes(A.generate_binary_matrix_data('Test', json_data))
+        except Exception as e:
+            return type(e)
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'ok': 2, 'flat': True, 'mul': 3},
+    {'mul': float('nan')},
+    {'flat': 1.7},
+    {'flat': '3'},
+    {'flat': 2 ** 31},
+    {'mul': '3'},
+    {'mul': None},
+    {'mul': 1e39},
+    {'v': [1.0]},
+    {'v': [1.0, '2']},
+])
+def test_numpy_matches_scalar(overrides, monkeypatch):
+    json_data = matrix(**overrides)
+    assert pack(json_data, monkeypatch, numpy=True) == pack(json_data, monkeypatch, numpy=False)
+
+
+def test_valid_matrix_uses_numpy():
+    json_data = matrix()
+    assert A.pack_matrix_cells_numpy(json_data, KEYS, KEYS, FIELDS) is not None
+    assert A.pack_matrix_cells_numpy(matrix(flat=1.7), KEYS, KEYS, FIELDS) is None
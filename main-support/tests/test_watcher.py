@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as A
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(A, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(A, '_data_dir_initialized', False)
+    monkeypatch.delenv(A.BUILD_CACHE_DIR_ENV, raising=False)
+    client = A.app.test_client()
+
+    def post(url, body=None):
+        # 既存の一覧・ドキュメントは現在のETagをIf-Matchで送る
+        etag = client.get(url).headers.get('ETag')
+        response = client.post(url, json=body, headers={'If-Match': etag} if etag else {})
+        assert response.status_code < 300, response.get_data(as_text=True)
+
+    post('/api/enum-id', {'name': 'Element'})
+    post('/api/enum/Element', [{'property': 'Fire', 'value': 1, 'description': ''}, {'property': 'Water', 'value': 2, 'description': ''}])
+    post('/api/class-data-id', {'name': 'Unit'})
+    unit = {'columns': [{'name': 'hp', 'type': 'int'}, {'name': 'elem', 'type': 'Element'}],
+            'rows': [{'id': i, 'enum_property': f'U{i}', 'data': {'hp': {'value': i}, 'elem': {'value': 'Element.Water'}}} for i in (1, 2)]}
+    post('/api/class-data-id/Unit', unit)
+    post('/api/class-data-id', {'name': 'Plain'})
+    post('/api/class-data-id/Plain', {'columns': [{'name': 'n', 'type': 'int'}], 'rows': [{'id': 1, 'enum_property': 'P1', 'data': {'n': {'value': 1}}}]})
+    post('/api/class-data', {'name': 'Stats'})
+    post('/api/class-data/Stats', [{'type': 'int', 'name': 'atk', 'description': '', 'arraySize': 0}])
+    post('/api/class-data', {'name': 'Wrap'})
+    post('/api/class-data/Wrap', [{'type': 'Stats', 'name': 'inner', 'description': '', 'arraySize': 0}])
+    post('/api/class-data-id', {'name': 'Gear'})
+    post('/api/class-data-id/Gear', {'columns': [{'name': 'stats', 'type': 'Stats'}, {'name': 'owner', 'type': 'Unit'}], 'rows': []})
+    post('/api/class-data-id', {'name': 'Bag'})
+    post('/api/class-data-id/Bag', {'columns': [{'name': 'wrap', 'type': 'Wrap'}], 'rows': []})
+    matrix = {'name': 'Dmg', 'rowId': 'Unit', 'colId': 'Unit', 'storage': 'flat', 'fields': [{'name': 'mul', 'type': 'float', 'description': ''}], 'data': {}}
+    post('/api/class-data-matrix-id', matrix)
+    matrix['data'] = {f'U{r}': {f'U{c}': {'mul': 1.0} for c in (1, 2)} for r in (1, 2)}
+    post('/api/class-data-matrix-id/Dmg', matrix)
+    for url in ('/api/generate-binary/Unit', '/api/generate-class-data-id/Unit'):
+        post(url, unit)
+    post('/api/generate-class-data-matrix-id/Dmg')
+    return client
+
+
+def urls(rel_path):
+    return [url for url, _ in A.get_regeneration_targets(rel_path)]
+
+
+def test_build_settings_rebuilds_per_table_and_matrix_outputs(client):
+    targets = urls(A.BUILD_SETTINGS_FILE)
+    for url in ('/api/generate-class-data-id/Unit', '/api/generate-binary/Unit',
+                '/api/generate-class-data-id/Plain', '/api/generate-binary/Plain',
+                '/api/generate-class-data-matrix-id/Dmg', '/api/generate-binary-matrix/Dmg',
+                '/api/generate-all-binary', '/api/generate-all-binary-matrix'):
+        assert url in targets
+
+
+def test_enum_change_rebuilds_tables_using_it(tmp_path, client):
+    targets = urls('enum/Element/Element.json')
+    assert '/api/generate-binary/Unit' in targets
+    assert '/api/generate-class-data-id/Unit' in targets
+    assert '/api/generate-binary/Plain' not in targets
+
+    # 値の変更がテーブルのバイナリに反映される
+    table_bin = tmp_path / 'class-data-id' / 'Unit' / 'UnitTable.bin'
+    before = table_bin.read_bytes()
+    watcher = A.DataDirWatcher('regenerate')
+    enum_path = tmp_path / 'enum' / 'Element' / 'Element.json'
+    enum_path.write_text(json.dumps([{'property': 'Fire', 'value': 1, 'description': ''}, {'property': 'Water', 'value': 7, 'description': ''}]), encoding='utf-8')
+    assert str(enum_path) in watcher.poll()
+    assert table_bin.read_bytes() != before
+
+
+def test_table_change_rebuilds_matrix_code_keyed_by_it(tmp_path, client):
+    targets = urls('class-data-id/Unit/Unit.json')
+    assert '/api/generate-class-data-matrix-id/Dmg' in targets
+    assert '/api/generate-binary-matrix/Dmg' in targets
+    assert '/api/generate-class-data-matrix-id/Dmg' not in urls('class-data-id/Plain/Plain.json')
+    # 全体の生成は個別の生成より後
+    assert targets.index('/api/generate-all-binary-matrix') > targets.index('/api/generate-binary-matrix/Dmg')
+
+
+def test_class_change_rebuilds_tables_using_it(client):
+    targets = urls('class-data/Stats/Stats.class.json')
+    for table in ('Gear', 'Bag'):  # Bag は Wrap の中の Stats
+        assert f'/api/generate-binary/{table}' in targets
+        assert f'/api/generate-class-data-id/{table}' in targets
+    assert '/api/generate-binary/Plain' not in targets
+    assert '/api/generate-binary/Gear' not in urls('class-data/Wrap/Wrap.class.json')
+
+
+def test_table_change_rebuilds_tables_referencing_its_ids(client):
+    targets = urls('class-data-id/Unit/Unit.json')
+    assert '/api/generate-binary/Gear' in targets
+    assert '/api/generate-class-data-id/Gear' in targets
+    assert '/api/generate-binary/Plain' not in targets
+    assert '/api/generate-binary/Gear' not in urls('class-data-id/Plain/Plain.json')
+
+
+def test_class_layout_follows_class_files(tmp_path, client):
+    class_list = ['Stats', 'Wrap']
+    assert A.get_class_layout('Wrap', class_list)[0][3] == [('atk', 'int', 0, None)]
+    # APIを通さずに子クラスの定義を書き換えても、親のレイアウトに反映される
+    stats_path = tmp_path / 'class-data' / 'Stats' / 'Stats.class.json'
+    stats_path.write_text(json.dumps([{'type': 'int', 'name': 'atk', 'description': '', 'arraySize': 0},
+                                      {'type': 'float', 'name': 'rate', 'description': '', 'arraySize': 0}]), encoding='utf-8')
+    assert [name for name, *_ in A.get_class_layout('Wrap', class_list)[0][3]] == ['atk', 'rate']
+    # class_list から外れたクラスは子レイアウトを持たない
+    assert A.get_class_layout('Wrap', ['Wrap'])[0][3] is None